@@ -0,0 +1,90 @@
+"""JWT-аутентификация без запроса к базе на каждый запрос клиента.
+
+Разрешениям нужны только id, имя, роль и флаги пользователя. Их снимок
+лежит в кэше API и сбрасывается сигналом при сохранении или удалении
+пользователя (`api.signals`). Из снимка `User.from_db` собирает
+экземпляр, остальные поля которого отложены и догружаются при
+обращении. Проверенные токены хранятся в памяти процесса, не дольше
+срока действия токена и AUTH_USER_CACHE_SECONDS.
+
+Сигнал сбрасывает снимок только в кэше API того процесса, где
+пользователь изменён, поэтому при нескольких процессах кэш должен быть
+общим. С локальным кэшем по умолчанию остальные процессы видят старую
+роль до истечения AUTH_USER_CACHE_SECONDS, и этот срок оставлен
+коротким; увеличивать его стоит только вместе с общим кэшем.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.cache import get_user_snapshot, set_user_snapshot
+
+USER_SNAPSHOT_FIELDS = ('id', 'username', 'role', 'is_superuser',
+                        'is_staff', 'is_active')
+
+
+class TokenCache:
+    """Ограниченный по размеру кэш с вытеснением давно не читанных."""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires):
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    tokens = TokenCache(settings.AUTH_TOKEN_CACHE_SIZE)
+
+    def get_validated_token(self, raw_token):
+        token = self.tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.tokens.set(raw_token, token, min(
+                token['exp'], time.time() + settings.AUTH_USER_CACHE_SECONDS
+            ))
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        if user_id is None or jwt_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        # from_db ждёт значения в порядке полей модели.
+        fields = [
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in USER_SNAPSHOT_FIELDS
+        ]
+        values = get_user_snapshot(user_id)
+        if values is not None:
+            return self.user_model.from_db(DEFAULT_DB_ALIAS, fields, values)
+        user = super().get_user(validated_token)
+        set_user_snapshot(user_id, tuple(
+            getattr(user, field) for field in fields))
+        return user
@@ -0,0 +1,78 @@
+import bisect
+import re
+import threading
+
+from api.cache import get_versions
+
+
+def fold(text):
+    """Приводит текст к виду для сравнения без учёта регистра и «ё»."""
+    return text.casefold().replace('ё', 'е')
+
+
+class PrefixIndex:
+    """Отсортированный в памяти процесса индекс названий и слагов.
+
+    Ключами служат слаг и каждое слово названия вместе с остатком
+    строки, так что «фант» находит и «Научную фантастику». Поиск -
+    двоичный по отсортированному списку ключей, без обращений к БД.
+    Индекс строится при первом запросе и перестраивается, когда версия
+    ресурса с именем модели в кэше (см. `api.signals`) отличается от
+    той, под которой он был загружен.
+    """
+
+    def __init__(self, model, fields=('name', 'slug')):
+        self.model = model
+        self.fields = fields
+        self.version_name = model._meta.model_name
+        self.state = (None, [], [], [])
+        self.lock = threading.Lock()
+
+    def load(self):
+        rows = sorted(
+            self.model.objects.values_list(*self.fields),
+            key=lambda row: (fold(row[0]), row[1])
+        )
+        entries = []
+        for position, (name, slug) in enumerate(rows):
+            folded = fold(name)
+            keys = {folded[match.start():]
+                    for match in re.finditer(r'\w+', folded)}
+            keys.add(fold(slug))
+            entries.extend((key, position) for key in keys)
+        entries.sort()
+        return (
+            [key for key, _ in entries],
+            [position for _, position in entries],
+            [dict(zip(self.fields, row)) for row in rows],
+        )
+
+    def get_state(self):
+        """Ключи, позиции и строки индекса актуальной версии.
+
+        Состояние подменяется одним присваиванием, поэтому читатели
+        в других потоках не видят наполовину перестроенный индекс.
+        """
+        version, = get_versions(self.version_name)
+        state = self.state
+        if state[0] != version:
+            with self.lock:
+                state = self.state
+                if state[0] != version:
+                    state = self.state = (version, *self.load())
+        return state[1:]
+
+    def lookup(self, prefix, limit):
+        """До `limit` записей, у которых слово названия или слаг
+        начинаются с `prefix`, в порядке названий."""
+        prefix = fold(prefix.strip())
+        if not prefix:
+            return []
+        keys, positions, rows = self.get_state()
+        found = set()
+        start = bisect.bisect_left(keys, prefix)
+        for index in range(start, len(keys)):
+            if not keys[index].startswith(prefix):
+                break
+            found.add(positions[index])
+        return [rows[position] for position in sorted(found)[:limit]]
@@ -0,0 +1,81 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'api:version:{}'
+WRITER_KEY = 'api:writer:{}'
+USER_KEY = 'api:user:{}'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_versions(*names):
+    """Текущие версии ресурсов в порядке `names`.
+
+    Отсутствующая версия заводится от текущего времени, а не с нуля,
+    чтобы после сброса кэша ключи не совпали со старыми. Версия живёт
+    API_CACHE_TIMEOUT: процесс с локальным кэшем, не видевший записи,
+    заведёт её заново и перестанет отдавать устаревшие данные, 304 и
+    подсказки не позже этого срока.
+    """
+    cache = get_cache()
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), settings.API_CACHE_TIMEOUT)
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def bump_versions(*names):
+    """Сдвигает версии ресурсов, делая все ключи с ними устаревшими."""
+    cache = get_cache()
+    for name in names:
+        key = VERSION_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), settings.API_CACHE_TIMEOUT)
+
+
+def make_key(prefix, request, versions, ignore_params=()):
+    """Ключ кэша из пути, упорядоченных параметров запроса и версий."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        if name not in ignore_params
+        for value in values
+    )
+    raw = repr((request.build_absolute_uri(request.path), params, versions))
+    return f'api:{prefix}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def mark_recent_writer(user):
+    """Запоминает, что пользователь только что писал в базу."""
+    if user.is_authenticated:
+        get_cache().set(WRITER_KEY.format(user.pk), True,
+                        settings.READ_AFTER_WRITE_SECONDS)
+
+
+def is_recent_writer(user):
+    return user.is_authenticated and bool(
+        get_cache().get(WRITER_KEY.format(user.pk)))
+
+
+def get_user_snapshot(pk):
+    """Сохранённые поля пользователя или None."""
+    return get_cache().get(USER_KEY.format(pk))
+
+
+def set_user_snapshot(pk, values):
+    get_cache().set(USER_KEY.format(pk), values,
+                    settings.AUTH_USER_CACHE_SECONDS)
+
+
+def forget_user(pk):
+    get_cache().delete(USER_KEY.format(pk))
@@ -1,13 +1,145 @@
+from django.db import connections
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django_filters import rest_framework as django_filters
 from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from reviews import search
+from reviews.models import Category, GenreTitle, Title
+
+AND = 'and'
+OR = 'or'
 
 
 class GenreCategoryFilterBackend(filters.BaseFilterBackend):
+    """Фильтр произведений по слагам жанров и категорий.
+
+    Несколько слагов передаются через запятую: `genre=drama,comedy`.
+    По умолчанию подходит любой из них, с `genre_mode=and` - только все
+    сразу (для категорий так же через `category_mode`). Условия строятся
+    подзапросами IN/EXISTS по GenreTitle, поэтому строки произведений
+    не размножаются соединением.
+    """
+
+    @staticmethod
+    def get_slugs(request, name):
+        value = request.query_params.get(name, '')
+        return sorted({slug.strip() for slug in value.split(',')} - {''})
+
+    @staticmethod
+    def get_mode(request, name):
+        mode = request.query_params.get(f'{name}_mode', OR).lower()
+        if mode not in (AND, OR):
+            raise ValidationError(
+                {f'{name}_mode': f'Допустимые значения: {AND}, {OR}.'})
+        return mode
 
     def filter_queryset(self, request, queryset, view):
-        genre_slug = request.query_params.get('genre', None)
-        category_slug = request.query_params.get('category', None)
-        if genre_slug:
-            queryset = queryset.filter(genre__slug=genre_slug)
-        if category_slug:
-            queryset = queryset.filter(category__slug=category_slug)
+        genre_slugs = self.get_slugs(request, 'genre')
+        category_slugs = self.get_slugs(request, 'category')
+        if genre_slugs:
+            queryset = self.filter_genres(
+                queryset, genre_slugs, self.get_mode(request, 'genre'))
+        if category_slugs:
+            queryset = self.filter_categories(
+                queryset, category_slugs, self.get_mode(request, 'category'))
+        return queryset
+
+    @staticmethod
+    def filter_genres(queryset, slugs, mode):
+        """ИЛИ - один IN по индексу (genre, title). И - такой же IN по
+        первому жанру и EXISTS по индексу (title, genre) для остальных."""
+        if mode == OR:
+            any_of, all_of = slugs, []
+        else:
+            any_of, all_of = slugs[:1], slugs[1:]
+        queryset = queryset.filter(id__in=GenreTitle.objects.filter(
+            genre__slug__in=any_of).values('title_id'))
+        for slug in all_of:
+            queryset = queryset.filter(Exists(GenreTitle.objects.filter(
+                title=OuterRef('pk'), genre__slug=slug)))
         return queryset
+
+    @staticmethod
+    def filter_categories(queryset, slugs, mode):
+        if mode == AND and len(slugs) > 1:
+            return queryset.none()
+        return queryset.filter(category_id__in=Category.objects.filter(
+            slug__in=slugs).values('id'))
+
+
+class TitleSearchFilterBackend(filters.BaseFilterBackend):
+    """Полнотекстовый поиск `?search=` по названию и описанию.
+
+    На SQLite отбирает id подзапросом к индексу FTS5 и сортирует по
+    bm25 из того же индекса. Условие и ранг - обычные выражения
+    queryset, так что поиск сочетается с only(), values() и `ordering`.
+    На других базах откатывается на icontains.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        query = search.match_query(text)
+        if query is None:
+            return queryset.none()
+        if not search.is_supported(connections[queryset.db]):
+            return queryset.filter(
+                Q(name__icontains=text) | Q(description__icontains=text))
+        table = queryset.model._meta.db_table
+        match = f'FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH %s'
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid {match}', (query,))
+        ).annotate(search_rank=RawSQL(
+            f'SELECT rank {match} AND rowid = "{table}"."id"', (query,)
+        )).order_by('search_rank', 'id')
+
+
+class TitleFilter(django_filters.FilterSet):
+    """Точные name и year и диапазон средней оценки.
+
+    `min_rating` и `max_rating` сравниваются с хранимой `rating_avg`,
+    для которой есть индекс, а не с агрегатом по отзывам.
+    """
+    min_rating = django_filters.NumberFilter(
+        field_name='rating_avg', lookup_expr='gte')
+    max_rating = django_filters.NumberFilter(
+        field_name='rating_avg', lookup_expr='lte')
+
+    class Meta:
+        model = Title
+        fields = ('name', 'year')
+
+
+class TitleOrderingFilter(filters.BaseFilterBackend):
+    """Сортировка `?ordering=-rating` или `?ordering=year`.
+
+    Поле ответа сопоставляется со столбцом через `ordering_fields`,
+    последним добавляется id в том же направлении, так что сортировка
+    целиком идёт по индексам (rating_avg, id) и (year, id). Неизвестные
+    поля пропускаются, как в `filters.OrderingFilter`. Произведения без
+    оценок при сортировке по возрастанию рейтинга идут первыми.
+    """
+    ordering_param = 'ordering'
+    ordering_fields = {'rating': 'rating_avg', 'year': 'year'}
+
+    def get_ordering(self, request):
+        ordering = []
+        value = request.query_params.get(self.ordering_param, '')
+        for term in value.split(','):
+            term = term.strip()
+            field = self.ordering_fields.get(term.lstrip('-'))
+            if field is not None:
+                ordering.append(f'-{field}' if term.startswith('-') else field)
+        if ordering:
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request)
+        if not ordering:
+            return queryset
+        return queryset.order_by(*ordering)
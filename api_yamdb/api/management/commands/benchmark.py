@@ -0,0 +1,109 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    FastReviewSerializer, FastTitleSerializer, ReadTitleSerializer,
+    ReviewSerializer
+)
+from reviews.models import Category, Genre, GenreTitle, Review, Title, User
+
+
+class Command(BaseCommand):
+    help = ('Замеряет стоимость сериализации одной строки и рендеринга '
+            'страницы произведений. Данные создаются во временной '
+            'транзакции и откатываются.')
+    targets = ('serializers', 'renderers')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=self.targets)
+        parser.add_argument('--rows', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def create_data(self, rows):
+        category = Category.objects.create(name='bench', slug='bench')
+        genres = [
+            Genre.objects.create(name=f'bench {number}', slug=f'bench{number}')
+            for number in range(3)
+        ]
+        users = [
+            User.objects.create(username=f'bench{number}',
+                                email=f'bench{number}@yamdb.fake')
+            for number in range(rows)
+        ]
+        title = None
+        for number in range(rows):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000,
+                description='Описание', category=category,
+                rating_sum=number, rating_count=number % 3
+            )
+            GenreTitle.objects.bulk_create(
+                GenreTitle(genre=genre, title=title) for genre in genres
+            )
+        for user in users:
+            Review.objects.create(title=title, author=user,
+                                  text='Текст отзыва', score=7)
+        titles = list(
+            Title.objects.filter(category=category)
+            .select_related('category').prefetch_related('genre')
+        )
+        reviews = list(
+            Review.objects.filter(title=title).select_related('author')
+        )
+        return titles, reviews
+
+    def measure(self, name, old, new, objects, repeat):
+        renderer = JSONRenderer()
+        old_json = renderer.render(old(objects, many=True).data)
+        new_json = renderer.render(new(objects, many=True).data)
+        results = []
+        for serializer in (old, new):
+            seconds = min(timeit.repeat(
+                lambda: serializer(objects, many=True).data,
+                number=1, repeat=repeat
+            ))
+            results.append(seconds / len(objects) * 1e6)
+        self.stdout.write(
+            f'{name}: {old.__name__} {results[0]:.1f} мкс/строка, '
+            f'{new.__name__} {results[1]:.1f} мкс/строка, '
+            f'ускорение x{results[0] / results[1]:.1f}, '
+            f'JSON {"совпадает" if old_json == new_json else "ОТЛИЧАЕТСЯ"}'
+        )
+
+    def measure_renderers(self, titles, repeat):
+        data = {
+            'count': len(titles),
+            'next': None,
+            'previous': None,
+            'results': FastTitleSerializer(titles, many=True).data,
+        }
+        results = []
+        for renderer in (JSONRenderer(), FastJSONRenderer()):
+            seconds = min(timeit.repeat(
+                lambda: renderer.render(data), number=1, repeat=repeat
+            ))
+            results.append(seconds * 1e3)
+        same = JSONRenderer().render(data) == FastJSONRenderer().render(data)
+        self.stdout.write(
+            f'render {len(titles)} titles: JSONRenderer {results[0]:.3f} мс, '
+            f'FastJSONRenderer {results[1]:.3f} мс, '
+            f'ускорение x{results[0] / results[1]:.1f}, '
+            f'JSON {"совпадает" if same else "ОТЛИЧАЕТСЯ"}'
+        )
+
+    def handle(self, *args, **options):
+        targets = (options['only'],) if options['only'] else self.targets
+        with transaction.atomic():
+            titles, reviews = self.create_data(options['rows'])
+            if 'serializers' in targets:
+                self.measure('titles', ReadTitleSerializer,
+                             FastTitleSerializer, titles, options['repeat'])
+                self.measure('reviews', ReviewSerializer,
+                             FastReviewSerializer, reviews, options['repeat'])
+            if 'renderers' in targets:
+                self.measure_renderers(titles, options['repeat'])
+            transaction.set_rollback(True)
@@ -39,3 +39,4 @@ class Command(BaseCommand):
         }
         for key, value in data.items():
             self.uploading_csv(key, value)
+        Title.recount_ratings()
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.cache import bump_versions
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Пересоздаёт полнотекстовый индекс произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.is_supported(connection):
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.')
+        search.rebuild(connection)
+        bump_versions('title')
+        self.stdout.write(self.style.SUCCESS(
+            'Полнотекстовый индекс произведений пересоздан'))
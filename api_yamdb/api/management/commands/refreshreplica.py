@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.cache import bump_versions
+from api.signals import VERSIONED_MODELS
+from reviews.db import copy_database, get_replica_alias
+
+
+class Command(BaseCommand):
+    help = ('Обновляет реплику для чтения копией основной базы '
+            'через backup API SQLite.')
+
+    def handle(self, *args, **options):
+        alias = get_replica_alias()
+        if alias is None:
+            raise CommandError(
+                'Реплика не настроена: задайте DATABASE_REPLICA_NAME.')
+        source, target = connections[DEFAULT_DB_ALIAS], connections[alias]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        copy_database(source, target)
+        # Пока реплика отставала, с неё могли закэшировать старые данные
+        # под уже новыми версиями.
+        bump_versions(*(model._meta.model_name for model in VERSIONED_MODELS))
+        self.stdout.write(self.style.SUCCESS(
+            f'Реплика {alias} обновлена из {DEFAULT_DB_ALIAS}'))
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews.db import get_pragmas
+
+# Прагмы, которые SQLite возвращает числом, а задаются обычно именем.
+NAMED_VALUES = {
+    'synchronous': ('off', 'normal', 'full', 'extra'),
+    'temp_store': ('default', 'file', 'memory'),
+}
+
+
+class Command(BaseCommand):
+    help = ('Показывает прагмы SQLite, действующие на соединении, '
+            'рядом с заданными в SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Прагмы есть только у SQLite.')
+        with connection.cursor() as cursor:
+            active = get_pragmas(cursor, settings.SQLITE_PRAGMAS)
+        for name, expected in settings.SQLITE_PRAGMAS.items():
+            value = active[name]
+            if value is None:
+                value = 'не поддерживается'
+            elif name in NAMED_VALUES:
+                value = NAMED_VALUES[name][value]
+            self.stdout.write(f'{name} = {value} (задано: {expected})')
@@ -0,0 +1,65 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api.queries')
+
+
+class QueryRecorder:
+    """Обёртка `execute_wrapper`, считающая запросы и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class QueryBudgetMiddleware:
+    """Число и время SQL-запросов на каждый запрос к API.
+
+    Итог пишется в лог `api.queries` с именем маршрута (`titles-list`,
+    `reviews-detail`). Если маршрут превысил бюджет из QUERY_BUDGETS,
+    запись идёт с уровнем WARNING. С QUERY_STATS_HEADERS итог
+    возвращается и в заголовках X-Query-Count и Server-Timing.
+    Запросы, которые потоковый ответ делает после возврата из
+    представления, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        match = request.resolver_match
+        route = match.view_name if match else None
+        budget = settings.QUERY_BUDGETS.get(route)
+        over_budget = budget is not None and recorder.count > budget
+        logger.log(
+            logging.WARNING if over_budget else logging.DEBUG,
+            '%s %s: %d SQL-запросов за %.1f мс%s',
+            request.method, route, recorder.count, recorder.duration * 1e3,
+            f', бюджет {budget}' if over_budget else ''
+        )
+        request.query_stats = recorder
+        if settings.QUERY_STATS_HEADERS:
+            response['X-Query-Count'] = recorder.count
+            response['Server-Timing'] = (
+                f'db;dur={recorder.duration * 1e3:.1f};'
+                f'desc="{recorder.count} queries"'
+            )
+        return response
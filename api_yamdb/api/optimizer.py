@@ -0,0 +1,139 @@
+"""Подгрузка связей и столбцов по полям сериализатора.
+
+`optimize_queryset` смотрит, какие поля выводит сериализатор, и сам
+добавляет select_related для внешних ключей, prefetch_related для
+связей many=True и only() для столбцов. Поддерживаются вложенные
+сериализаторы, RelatedField (SlugRelatedField, PrimaryKeyRelatedField)
+и ManyRelatedField. Если источник поля не столбец модели (свойство,
+SerializerMethodField), столбцы не урезаются, пока сериализатор не
+назовёт их в `Meta.field_columns`. Сериализатор, который выводит
+чужое представление (FastReadSerializer, WriteTitleSerializer),
+указывает его в `source_serializer`.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+
+class QueryPlan:
+    """Что нужно подгрузить для набора полей одной модели."""
+
+    def __init__(self, model):
+        self.model = model
+        # Внешние ключи дёшевы, а без них менеджер связи (title.reviews)
+        # догружал бы title_id для каждой строки.
+        self.columns = {model._meta.pk.name} | {
+            field.name for field in model._meta.concrete_fields
+            if field.is_relation
+        }
+        self.select = []
+        self.prefetch = []
+        self.exact = True
+
+    def apply(self, queryset, only=True):
+        if self.select:
+            queryset = queryset.select_related(*self.select)
+        if self.prefetch:
+            queryset = queryset.prefetch_related(*self.prefetch)
+        if only and self.exact:
+            queryset = queryset.only(*self.columns)
+        return queryset
+
+    def merge(self, plan, path):
+        """Вкладывает план связанной модели, подгружаемой по `path`.
+
+        Если столбцы связанной модели неизвестны, они не упоминаются
+        в only(), и Django загружает её строку целиком.
+        """
+        if plan.exact:
+            self.columns.update(
+                f'{path}__{column}' for column in plan.columns)
+        self.select.extend(f'{path}__{name}' for name in plan.select)
+        self.prefetch.extend(
+            Prefetch(f'{path}__{lookup.prefetch_through}',
+                     queryset=lookup.queryset)
+            for lookup in plan.prefetch
+        )
+
+
+def get_output_fields(serializer):
+    """Поля DRF, которые сериализатор выводит в ответ."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    source = getattr(serializer, 'source_serializer', None)
+    if source is not None:
+        return list(source(context=serializer.context).fields.values())
+    return [
+        field for field in serializer.fields.values() if not field.write_only
+    ]
+
+
+def get_field_columns(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    source = getattr(serializer, 'source_serializer', None) or serializer
+    return getattr(getattr(source, 'Meta', None), 'field_columns', {})
+
+
+def related_plan(field, model):
+    """План для связанной модели, выводимой полем `field`."""
+    if isinstance(field, serializers.ManyRelatedField):
+        field = field.child_relation
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.BaseSerializer):
+        return build_plan(model, field)
+    plan = QueryPlan(model)
+    if isinstance(field, serializers.SlugRelatedField):
+        plan.columns.add(field.slug_field)
+    elif not isinstance(field, serializers.PrimaryKeyRelatedField):
+        plan.exact = False
+    return plan
+
+
+def build_plan(model, serializer):
+    plan = QueryPlan(model)
+    field_columns = get_field_columns(serializer)
+    for field in get_output_fields(serializer):
+        if field.field_name in field_columns:
+            plan.columns.update(field_columns[field.field_name])
+            continue
+        if len(field.source_attrs) != 1:
+            plan.exact = False
+            continue
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            plan.exact = False
+            continue
+        if not model_field.is_relation:
+            plan.columns.add(model_field.name)
+            continue
+        related = related_plan(field, model_field.related_model)
+        forward = model_field.many_to_one or (
+            model_field.one_to_one and model_field.concrete)
+        if forward:
+            plan.columns.add(model_field.name)
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            plan.select.append(model_field.name)
+            plan.merge(related, model_field.name)
+            continue
+        if model_field.one_to_many:
+            related.columns.add(model_field.field.name)
+        plan.prefetch.append(Prefetch(
+            model_field.name,
+            queryset=related.apply(model_field.related_model.objects.all())
+        ))
+    return plan
+
+
+def optimize_queryset(queryset, serializer, only=True, always_loaded=()):
+    """Queryset с подгрузкой всего, что выводит `serializer`.
+
+    С `only=False` столбцы не урезаются: так безопаснее для запросов
+    на запись, где изменённый объект сохраняется целиком.
+    """
+    plan = build_plan(queryset.model, serializer)
+    plan.columns.update(always_loaded)
+    return plan.apply(queryset, only=only)
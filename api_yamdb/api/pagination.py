@@ -0,0 +1,268 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework import exceptions, pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from api.cache import get_cache, get_versions, make_key
+from reviews.db import get_read_database
+
+
+class CountedPaginator(Paginator):
+    """Paginator, которому общее число строк можно передать готовым."""
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            self.count = count
+
+
+class CachedCountPagination(pagination.PageNumberPagination):
+    """Постраничная пагинация без отдельного COUNT(*) на каждый запрос.
+
+    Число строк берётся из счётчика родителя (`get_pagination_count`
+    у представления), из кэша по фильтру и версиям `cache_versions`
+    представления или считается запросом, если ни то ни другое не задано.
+    С `?count=false` поле `count` не отдаётся вовсе, а признак следующей
+    страницы определяется по лишней строке.
+    """
+    count_query_param = 'count'
+    count_disabled_values = ('0', 'false', 'no')
+    uncached_params = ('page', 'page_size', 'count')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.with_count = (
+            request.query_params.get(self.count_query_param, '').lower()
+            not in self.count_disabled_values
+        )
+        if not self.with_count:
+            return self.paginate_without_count(queryset, request, page_size)
+        paginator = CountedPaginator(
+            queryset, page_size,
+            count=self.get_count(queryset, request, view)
+        )
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def paginate_without_count(self, queryset, request, page_size):
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param),
+                message='Неверный номер страницы.'))
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        if not rows and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=self.page_number, message='Страница пуста.'))
+        self.has_next = len(rows) > page_size
+        self.rows = rows[:page_size]
+        return self.rows
+
+    def get_count(self, queryset, request, view):
+        count = getattr(view, 'get_pagination_count', lambda: None)()
+        if count is not None:
+            return count
+        resources = getattr(view, 'cache_versions', ())
+        if not resources:
+            return queryset.count()
+        cache = get_cache()
+        key = make_key(
+            'count', request,
+            (get_read_database(), get_versions(*resources)),
+            self.uncached_params
+        )
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.API_CACHE_TIMEOUT)
+        return count
+
+    def get_paginated_response(self, data):
+        if self.with_count:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.with_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if self.with_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param, self.page_number - 1)
+
+
+class KeysetPagination(pagination.BasePagination):
+    """Курсорная пагинация по ключу из нескольких полей.
+
+    Страница выбирается условием на значения ключа последней строки,
+    поэтому время ответа не зависит от глубины, а COUNT(*) не нужен.
+    Поля ключа в сумме должны быть уникальны, последним обычно идёт id.
+    Параметры `ordering_params` задают свой порядок строк, с которым
+    ключ курсора не совпадёт, поэтому вместе с курсором дают 400.
+    """
+    ordering = ('id',)
+    ordering_params = ()
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    @classmethod
+    def is_requested(cls, request):
+        return (
+            cls.cursor_query_param in request.query_params
+            or request.query_params.get(cls.mode_query_param) == 'cursor'
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        conflicts = [
+            name for name in self.ordering_params
+            if request.query_params.get(name, '').strip()
+        ]
+        if conflicts:
+            raise exceptions.ValidationError({name: [
+                'Не сочетается с курсорной пагинацией: курсор идёт по '
+                f'полям {", ".join(self.ordering)}.'
+            ] for name in conflicts})
+        self.base_url = request.build_absolute_uri()
+        position, reverse = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.seek(position, reverse))
+        rows = list(
+            queryset.order_by(*self.get_ordering(reverse))[
+                :self.page_size + 1]
+        )
+        has_more = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def seek(self, position, reverse):
+        """Условие «строго после позиции» в порядке ordering.
+
+        Первое поле дополнительно ограничено нестрогим неравенством,
+        чтобы база могла начать просмотр индекса с нужного места.
+        """
+        condition = Q()
+        equal = Q()
+        first_lookup = None
+        for field, value in zip(self.ordering, position):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+            lookup = 'lt' if descending != reverse else 'gt'
+            if first_lookup is None:
+                first_lookup = Q(**{f'{name}__{lookup}e': value})
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return first_lookup & condition
+
+    def decode_cursor(self, request, model):
+        """Позиция и направление из курсора.
+
+        Значения приводятся полями модели: подделанный курсор с чужими
+        типами или пустыми значениями даёт 404, а не ошибку в seek().
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            reverse, position = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def encode_cursor(self, instance, reverse):
+        position = [
+            getattr(instance, field.lstrip('-')) for field in self.ordering
+        ]
+        encoded = base64.urlsafe_b64encode(
+            json.dumps([int(reverse), position],
+                       cls=DjangoJSONEncoder).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded)
+
+
+class TitleCursorPagination(KeysetPagination):
+    ordering = ('year', 'id')
+    ordering_params = ('ordering', 'search')
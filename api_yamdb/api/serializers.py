@@ -1,17 +1,64 @@
-from rest_framework import serializers
+from django.db import IntegrityError, models, transaction
+from django.utils.functional import cached_property
+from rest_framework import permissions, serializers
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueValidator
 
 from reviews.constants import (
     ADMIN, EMAIL_LEHGTH, USERNAME_LENGTH, MODERATOR, USER
 )
+from api.cache import bump_versions
 from reviews.models import (
-    Category, Comment, Genre, Review, Title, User
+    Category, Comment, Genre, GenreTitle, Review, Title, User
 )
 from reviews.validators import validate_username
 from reviews.validators_2 import validate_unique
 
 
+FIELDS_QUERY_PARAM = 'fields'
+
+
+def get_requested_fields(request, available):
+    """Множество полей из `?fields=a,b` для чтения.
+
+    Для запросов на запись, без параметра и с пустым параметром
+    возвращает None: урезать поля можно только в ответах на GET.
+    Имена не из `available` дают ошибку 400.
+    """
+    if (
+        request is None
+        or request.method not in permissions.SAFE_METHODS
+        or FIELDS_QUERY_PARAM not in request.query_params
+    ):
+        return None
+    requested = {
+        name.strip()
+        for name in request.query_params[FIELDS_QUERY_PARAM].split(',')
+        if name.strip()
+    }
+    if not requested:
+        return None
+    unknown = requested.difference(available)
+    if unknown:
+        raise ValidationError({FIELDS_QUERY_PARAM: [
+            f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+        ]})
+    return requested
+
+
+class SparseFieldsMixin:
+    """Оставляет в ответе только поля, перечисленные в `?fields=`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(
+            self.context.get('request'), self.fields)
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
 class AuthorFieldMixin(serializers.Serializer):
     author = serializers.SlugRelatedField(
         slug_field='username',
@@ -56,40 +103,261 @@ class WriteTitleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating_avg')
+
+    @property
+    def source_serializer(self):
+        return ReadTitleSerializer
 
     def to_representation(self, instance):
         serializer = ReadTitleSerializer(instance)
         return serializer.data
 
 
-class ReadTitleSerializer(serializers.ModelSerializer):
+class BulkTitleListSerializer(serializers.ListSerializer):
+
+    def create(self, validated_data):
+        titles = [
+            Title(**{
+                name: value for name, value in item.items()
+                if name != 'genre'
+            })
+            for item in validated_data
+        ]
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            if titles and titles[0].pk is None:
+                # SQLite в Django 3.2 не возвращает ключи из bulk_create.
+                # Внутри транзакции после вставки запись заблокирована,
+                # поэтому последние len(titles) id принадлежат этой пачке.
+                ids = Title.objects.order_by('-id').values_list(
+                    'id', flat=True)[:len(titles)]
+                for title, pk in zip(titles, reversed(ids)):
+                    title.pk = pk
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title=title, genre=genre)
+                for title, item in zip(titles, validated_data)
+                for genre in dict.fromkeys(item['genre'])
+            )
+        bump_versions('title', 'genretitle')
+        return titles
+
+
+class BulkTitleSerializer(serializers.ModelSerializer):
+    """Произведение из пакетной загрузки.
+
+    Слаги жанров и категорий не ищутся по одному, а берутся из словарей
+    `genres` и `categories` в context, собранных `resolve_slugs`.
+    """
+    genre = serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False
+    )
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        exclude = ('rating_sum', 'rating_count', 'rating_avg')
+        list_serializer_class = BulkTitleListSerializer
+
+    @staticmethod
+    def resolve_slugs(data):
+        """Находит все упомянутые жанры и категории двумя запросами."""
+        genres, categories = set(), set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            genre = item.get('genre')
+            if isinstance(genre, list):
+                genres.update(slug for slug in genre if isinstance(slug, str))
+            if isinstance(item.get('category'), str):
+                categories.add(item['category'])
+        return {
+            'genres': Genre.objects.in_bulk(genres, field_name='slug'),
+            'categories': Category.objects.in_bulk(
+                categories, field_name='slug'),
+        }
+
+    def resolve(self, name, slug):
+        try:
+            return self.context[name][slug]
+        except KeyError:
+            raise ValidationError(
+                serializers.SlugRelatedField.default_error_messages[
+                    'does_not_exist'].format(slug_name='slug', value=slug)
+            )
+
+    def validate_genre(self, value):
+        return [self.resolve('genres', slug) for slug in value]
+
+    def validate_category(self, value):
+        return self.resolve('categories', value)
+
+
+class TitleListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        titles = list(
+            data.all() if isinstance(data, models.Manager) else data)
+        if 'rating' in self.child.fields:
+            Title.load_ratings(titles)
+        return super().to_representation(titles)
+
+
+class ReadTitleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'rating_avg')
+        list_serializer_class = TitleListSerializer
+        field_columns = {'rating': ('rating_sum', 'rating_count')}
 
 
-class ReviewSerializer(AuthorFieldMixin, serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, AuthorFieldMixin,
+                       serializers.ModelSerializer):
 
     class Meta:
         fields = ('id', 'author', 'text', 'score', 'pub_date')
         model = Review
 
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context['view'].kwargs.get('title_id')
-        if request.method == 'POST':
-            author = request.user
-            if Review.objects.filter(title_id=title_id, author=author):
-                raise ValidationError('Вы уже оставили отзыв!')
-        return data
+    def create(self, validated_data):
+        """Повторный отзыв отсекает ограничение one_author_one_title.
+
+        Вставка идёт в точке сохранения: при нарушении откатывается
+        только она, а ошибка превращается в обычный ответ 400.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author']
+            ).exists():
+                raise
+        raise ValidationError(
+            {api_settings.NON_FIELD_ERRORS_KEY: ['Вы уже оставили отзыв!']}
+        )
+
+
+class FastReadSerializer(serializers.BaseSerializer):
+    """Сериализатор только для чтения, собирающий словарь напрямую.
+
+    Обходит механику полей ModelSerializer на горячих списках.
+    Наследник перечисляет поля в `field_names` в порядке вывода и для
+    каждого задаёт статический `get_<поле>(instance)`, а в
+    `source_serializer` - ModelSerializer с тем же выводом, по которому
+    api.optimizer подбирает подгрузку. Параметр `?fields=`
+    поддерживается так же, как в SparseFieldsMixin.
+    """
+    field_names = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Неизвестные поля отклоняются до начала ответа, в том числе
+        # потокового.
+        self.fields
+
+    @cached_property
+    def fields(self):
+        requested = get_requested_fields(
+            self.context.get('request'), self.field_names)
+        return tuple(
+            name for name in self.field_names
+            if requested is None or name in requested
+        )
+
+    @cached_property
+    def getters(self):
+        return tuple(
+            (name, getattr(self, f'get_{name}')) for name in self.fields
+        )
+
+    def to_representation(self, instance):
+        return {name: getter(instance) for name, getter in self.getters}
+
+
+_datetime_field = serializers.DateTimeField()
+
+
+class FastTitleSerializer(FastReadSerializer):
+    """Вывод ReadTitleSerializer без ModelSerializer."""
+    source_serializer = ReadTitleSerializer
+    field_names = (
+        'id', 'genre', 'category', 'rating', 'name', 'year', 'description'
+    )
+
+    class Meta:
+        list_serializer_class = TitleListSerializer
+
+    @staticmethod
+    def get_id(title):
+        return title.id
+
+    @staticmethod
+    def get_genre(title):
+        return [
+            {'name': genre.name, 'slug': genre.slug}
+            for genre in title.genre.all()
+        ]
+
+    @staticmethod
+    def get_category(title):
+        category = title.category
+        if category is None:
+            return None
+        return {'name': category.name, 'slug': category.slug}
+
+    @staticmethod
+    def get_rating(title):
+        rating = title.rating
+        return None if rating is None else int(rating)
+
+    @staticmethod
+    def get_name(title):
+        return title.name
+
+    @staticmethod
+    def get_year(title):
+        return title.year
+
+    @staticmethod
+    def get_description(title):
+        return title.description
+
+
+class FastReviewSerializer(FastReadSerializer):
+    """Вывод ReviewSerializer без ModelSerializer."""
+    source_serializer = ReviewSerializer
+    field_names = ('id', 'author', 'text', 'score', 'pub_date')
+
+    @staticmethod
+    def get_id(review):
+        return review.id
+
+    @staticmethod
+    def get_author(review):
+        author = review.author
+        return None if author is None else author.username
+
+    @staticmethod
+    def get_text(review):
+        return review.text
+
+    @staticmethod
+    def get_score(review):
+        return review.score
+
+    @staticmethod
+    def get_pub_date(review):
+        return _datetime_field.to_representation(review.pub_date)
 
 
-class CommentSerializer(AuthorFieldMixin, serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, AuthorFieldMixin,
+                        serializers.ModelSerializer):
 
     class Meta:
         fields = ('id', 'author', 'text', 'pub_date')
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.cache import bump_versions, forget_user
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+VERSIONED_MODELS = (
+    Category, Comment, Genre, Review, Title, Title.genre.through, User
+)
+
+
+def bump_now_and_on_commit(name):
+    """Сдвигает версию сразу и ещё раз после коммита.
+
+    Иначе читатель между сигналом и коммитом закэшировал бы старые
+    данные под уже новой версией.
+    """
+    bump_versions(name)
+    transaction.on_commit(lambda: bump_versions(name))
+
+
+# Строки этих таблиц удаляются вместе с родителем. Приёмник post_delete
+# на них лишил бы Django быстрого удаления: вместо одного
+# DELETE ... WHERE review_id IN (...) он выбирал бы все строки ради
+# сигналов. Поэтому их версию сдвигает удаление родителя, а прямое
+# удаление комментария - CommentViewSet.
+FAST_DELETED_MODELS = (Comment, Title.genre.through)
+CASCADED_VERSIONS = {
+    Genre: ('genretitle',),
+    Review: ('comment',),
+    Title: ('genretitle',),
+    User: ('comment',),
+}
+
+
+def bump_model_version(sender, **kwargs):
+    bump_now_and_on_commit(sender._meta.model_name)
+
+
+def bump_cascaded_versions(sender, **kwargs):
+    for name in CASCADED_VERSIONS[sender]:
+        bump_now_and_on_commit(name)
+
+
+for model in VERSIONED_MODELS:
+    name = model._meta.model_name
+    post_save.connect(bump_model_version, sender=model,
+                      dispatch_uid=f'api_bump_{name}_on_save')
+    if model not in FAST_DELETED_MODELS:
+        post_delete.connect(bump_model_version, sender=model,
+                            dispatch_uid=f'api_bump_{name}_on_delete')
+for model in CASCADED_VERSIONS:
+    post_delete.connect(
+        bump_cascaded_versions, sender=model,
+        dispatch_uid=f'api_bump_{model._meta.model_name}_children')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_genre_title_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_now_and_on_commit(sender._meta.model_name)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Снимок для аутентификации удаляется сразу и после коммита,
+    по той же причине, что и версии в `bump_now_and_on_commit`."""
+    forget_user(instance.pk)
+    transaction.on_commit(lambda: forget_user(instance.pk))
@@ -1,110 +1,465 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, IntegerField
 from django_filters.rest_framework import DjangoFilterBackend
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from rest_framework import (
-    filters, generics, mixins, pagination, status, viewsets
+    filters, generics, mixins, permissions, status, viewsets
 )
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
-from .filters import GenreCategoryFilterBackend
+from .autocomplete import PrefixIndex
+from .cache import (
+    get_cache, get_versions, is_recent_writer, make_key, mark_recent_writer
+)
+from .filters import (
+    GenreCategoryFilterBackend, TitleFilter, TitleOrderingFilter,
+    TitleSearchFilterBackend
+)
+from .optimizer import optimize_queryset
+from .pagination import (
+    CachedCountPagination, KeysetPagination, TitleCursorPagination
+)
+from .renderers import FastJSONRenderer, NDJSONRenderer
+from .signals import bump_now_and_on_commit
 from api.permissions import (
     IsSuperUserOrAdmin,
     OnlyAdminIfNotGet,
     IsAuthenticatedOrAuthor
 )
 from api.serializers import (
+    BulkTitleSerializer,
     CategorySerializer,
     CommentSerializer,
+    FastReviewSerializer,
+    FastTitleSerializer,
     GenreSerializer,
-    ReadTitleSerializer,
     ReviewSerializer,
     SignUpSerializer,
     TokenSerializer,
     UserSerializer,
     WriteTitleSerializer,
 )
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.db import (
+    get_read_database, get_replica_alias, reading_from, route_reads_to
+)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+class CachedResponseMixin:
+    """Условные GET и кэш данных для ответов list.
+
+    Представления с retrieve оборачивают его в `cached_response` сами.
+    Ключ строится из адреса, упорядоченных параметров запроса и версий
+    ресурсов из `cache_versions`; запись в любой из них сдвигает версию,
+    и старые ключи просто перестают запрашиваться. Из того же ключа
+    получается ETag, поэтому на совпавший If-None-Match ответ 304
+    отдаётся без запросов к БД и без сериализации.
+    """
+    cache_versions = ()
+    cache_response_data = True
+    cache_control = 'no-cache'
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = make_key(
+            'response', request, (
+                request.accepted_renderer.format,
+                get_read_database(),
+                get_versions(*self.cache_versions),
+            )
+        )
+        etag = quote_etag(key.rsplit(':', 1)[-1])
+        if etag in {
+            tag[2:] if tag.startswith('W/') else tag
+            for tag in parse_etags(
+                request.META.get('HTTP_IF_NONE_MATCH', ''))
+        }:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = self.get_cached_response(
+                key, handler, request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            response['Cache-Control'] = self.cache_control
+            patch_vary_headers(response, ('Accept',))
+        return response
+
+    def get_cached_response(self, key, handler, request, *args, **kwargs):
+        if not self.cache_response_data:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+
+class ReadReplicaMixin:
+    """Безопасные запросы читают с реплики, если она настроена.
+
+    Небезопасный запрос помечает пользователя недавним писателем, и
+    следующие READ_AFTER_WRITE_SECONDS его чтения идут в основную базу,
+    так что он сразу видит свои изменения. Пометка хранится в кэше API,
+    поэтому при нескольких процессах кэш должен быть общим.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with reading_from(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method not in permissions.SAFE_METHODS:
+            mark_recent_writer(request.user)
+        elif not is_recent_writer(request.user):
+            route_reads_to(get_replica_alias())
 
 
 class BaseMixin:
     permission_classes = (OnlyAdminIfNotGet,)
-    pagination_class = pagination.PageNumberPagination
+    pagination_class = CachedCountPagination
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
 
 
-class CategoryViewSet(mixins.CreateModelMixin,
+class AutocompleteMixin:
+    """Подсказки по началу названия или слага: `autocomplete/?q=`.
+
+    Отвечает из `autocomplete_index` в памяти процесса, без запросов
+    к БД, пока не изменились данные модели.
+    """
+    autocomplete_index = None
+    autocomplete_query_param = 'q'
+    autocomplete_limit_param = 'limit'
+    autocomplete_limit = 10
+    autocomplete_max_limit = 50
+
+    def get_autocomplete_limit(self, request):
+        value = request.query_params.get(
+            self.autocomplete_limit_param, self.autocomplete_limit)
+        try:
+            limit = int(value)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            raise ValidationError({
+                self.autocomplete_limit_param: (
+                    'Ожидается целое положительное число.')
+            })
+        return min(limit, self.autocomplete_max_limit)
+
+    @action(detail=False, url_path='autocomplete', methods=['get'])
+    def autocomplete(self, request):
+        return Response(self.autocomplete_index.lookup(
+            request.query_params.get(self.autocomplete_query_param, ''),
+            self.get_autocomplete_limit(request)
+        ))
+
+
+class CursorPaginationMixin:
+    """Включает курсорную пагинацию по запросу клиента.
+
+    Без параметров `cursor` или `pagination=cursor` работает обычная
+    постраничная пагинация `pagination_class`.
+    """
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, '_paginator')
+            and self.cursor_pagination_class is not None
+            and self.cursor_pagination_class.is_requested(self.request)
+        ):
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+
+class QueryOptimizerMixin:
+    """Подгружает связи и столбцы, которые выводит сериализатор.
+
+    План строит api.optimizer по полям `get_serializer()`, поэтому
+    учитываются и `?fields=`, и новые поля сериализатора. Столбцы
+    урезаются только для чтения; `always_loaded` нужны помимо вывода,
+    например для курсора пагинации.
+    """
+    always_loaded = ()
+
+    def filter_queryset(self, queryset):
+        return optimize_queryset(
+            super().filter_queryset(queryset),
+            self.get_serializer(),
+            only=self.request.method in permissions.SAFE_METHODS,
+            always_loaded=self.always_loaded,
+        )
+
+
+class NestedResourceMixin:
+    """Родитель вложенного ресурса, найденный один раз на запрос.
+
+    `parent_lookups` сопоставляет аргументы адреса с полями
+    `parent_model`. В них входит вся цепочка (у отзыва для комментария -
+    и id, и title_id), поэтому один запрос и находит родителя, и
+    проверяет, что он принадлежит указанному произведению.
+    """
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.parent_model, **{
+                field: self.kwargs[kwarg]
+                for kwarg, field in self.parent_lookups.items()
+            })
+        return self._parent
+
+
+class ReadSerializerMixin:
+    """Отдаёт `read_serializer_class` для действий из `read_actions`."""
+    read_serializer_class = None
+    read_actions = ('list', 'retrieve')
+
+    def get_serializer_class(self):
+        if (
+            self.read_serializer_class is not None
+            and self.action in self.read_actions
+        ):
+            return self.read_serializer_class
+        return super().get_serializer_class()
+
+
+class CategoryViewSet(CachedResponseMixin,
+                      ReadReplicaMixin,
+                      AutocompleteMixin,
+                      QueryOptimizerMixin,
+                      mixins.CreateModelMixin,
                       mixins.DestroyModelMixin,
                       mixins.ListModelMixin,
                       BaseMixin,
                       viewsets.GenericViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_versions = ('category',)
+    autocomplete_index = PrefixIndex(Category)
+    cache_control = settings.CATALOG_CACHE_CONTROL
 
 
-class GenreViewSet(mixins.CreateModelMixin,
+class GenreViewSet(CachedResponseMixin,
+                   ReadReplicaMixin,
+                   AutocompleteMixin,
+                   QueryOptimizerMixin,
+                   mixins.CreateModelMixin,
                    mixins.DestroyModelMixin,
                    mixins.ListModelMixin,
                    BaseMixin,
                    viewsets.GenericViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_versions = ('genre',)
+    autocomplete_index = PrefixIndex(Genre)
+    cache_control = settings.CATALOG_CACHE_CONTROL
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.prefetch_related('genre').select_related(
-        'category').annotate(rating=Avg('reviews__score')).order_by('year')
+class TitleViewSet(CachedResponseMixin,
+                   ReadReplicaMixin,
+                   ReadSerializerMixin,
+                   QueryOptimizerMixin,
+                   CursorPaginationMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.order_by('year')
+    serializer_class = WriteTitleSerializer
+    read_serializer_class = FastTitleSerializer
     permission_classes = (OnlyAdminIfNotGet,)
-    pagination_class = pagination.PageNumberPagination
-    filter_backends = (DjangoFilterBackend, GenreCategoryFilterBackend)
-    filterset_fields = ('name', 'year')
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = TitleCursorPagination
+    cache_versions = ('title', 'genretitle', 'genre', 'category', 'review')
+    always_loaded = ('year',)
+    read_actions = ('list', 'retrieve', 'export')
+    filter_backends = (
+        DjangoFilterBackend,
+        GenreCategoryFilterBackend,
+        TitleSearchFilterBackend,
+        TitleOrderingFilter,
+    )
+    filterset_class = TitleFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
 
-    def get_serializer_class(self):
-        if self.action in ('retrieve', 'list'):
-            return ReadTitleSerializer
-        return WriteTitleSerializer
+    export_chunk_size = 500
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = BulkTitleSerializer(
+            data=request.data,
+            many=True,
+            context={
+                **self.get_serializer_context(),
+                **BulkTitleSerializer.resolve_slugs(request.data),
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        titles = serializer.save()
+        titles = self.queryset.filter(
+            pk__in=[title.pk for title in titles]
+        ).select_related('category').prefetch_related('genre').order_by('id')
+        return Response(
+            self.read_serializer_class(titles, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(
+        detail=False,
+        url_path='export',
+        methods=['get'],
+        renderer_classes=[NDJSONRenderer, FastJSONRenderer],
+    )
+    def export(self, request):
+        """Весь каталог с учётом фильтров потоком NDJSON.
+
+        Строки читаются кусками по `export_chunk_size` с условием на id
+        вместо OFFSET, жанры подгружаются для каждого куска отдельно,
+        так что память не растёт с размером каталога. Генератор
+        работает уже после выхода из dispatch, поэтому база для чтения
+        (реплика, см. ReadReplicaMixin) запоминается здесь.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        return StreamingHttpResponse(
+            self.export_rows(queryset, get_read_database()),
+            content_type=NDJSONRenderer.media_type
+        )
+
+    @action(detail=False, url_path='facets', methods=['get'])
+    def facets(self, request):
+        """Число произведений по жанрам, категориям и десятилетиям.
+
+        Считается для тех же фильтров, что и список, тремя запросами
+        с GROUP BY; ответ кэшируется по фильтру и версиям данных.
+        """
+        return self.cached_response(self.facets_response, request)
+
+    def facets_response(self, request):
+        queryset = self.filter_queryset(
+            self.get_queryset()).prefetch_related(None).order_by()
+        decades = list(
+            queryset.annotate(decade=ExpressionWrapper(
+                F('year') / 10 * 10, output_field=IntegerField()))
+            .values('decade').annotate(count=Count('id')).order_by('decade')
+        )
+        return Response({
+            'count': sum(decade['count'] for decade in decades),
+            'genre': self.count_by(queryset, 'genre', distinct=True),
+            'category': self.count_by(queryset, 'category'),
+            'decade': decades,
+        })
+
+    @staticmethod
+    def count_by(queryset, relation, distinct=False):
+        rows = (
+            queryset.filter(**{f'{relation}__isnull': False})
+            .values_list(f'{relation}__slug', f'{relation}__name')
+            .annotate(count=Count('id', distinct=distinct))
+            .order_by('-count', f'{relation}__slug')
+        )
+        return [
+            {'slug': slug, 'name': name, 'count': count}
+            for slug, name, count in rows
+        ]
+
+    def export_rows(self, queryset, database):
+        renderer = FastJSONRenderer()
+        context = self.get_serializer_context()
+        last_id = 0
+        while True:
+            with reading_from(database):
+                chunk = list(
+                    queryset.filter(id__gt=last_id)[:self.export_chunk_size])
+                rows = self.read_serializer_class(
+                    chunk, many=True, context=context).data
+            if not chunk:
+                return
+            for row in rows:
+                yield renderer.render(row) + b'\n'
+            last_id = chunk[-1].id
+
+
+class ReviewViewSet(CachedResponseMixin,
+                    ReadReplicaMixin,
+                    NestedResourceMixin,
+                    ReadSerializerMixin,
+                    QueryOptimizerMixin,
+                    CursorPaginationMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    read_serializer_class = FastReviewSerializer
+    parent_model = Title
+    parent_lookups = {'title_id': 'id'}
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = KeysetPagination
+    cache_versions = ('title', 'review', 'user')
+    cache_response_data = False
     permission_classes = [IsAuthenticatedOrAuthor]
     http_method_names = ['get', 'post', 'delete', 'patch']
 
-    def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+    def get_pagination_count(self):
+        return self.get_parent().rating_count
 
     def get_queryset(self):
-        title = self.get_title()
-        return title.reviews.all().order_by('id')
+        return self.get_parent().reviews.all().order_by('id')
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            serializer.save()
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(ReadReplicaMixin,
+                     NestedResourceMixin,
+                     QueryOptimizerMixin,
+                     CursorPaginationMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
+    parent_model = Review
+    parent_lookups = {'review_id': 'id', 'title_id': 'title_id'}
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = KeysetPagination
+    cache_versions = ('comment',)
     permission_classes = [IsAuthenticatedOrAuthor]
     http_method_names = ['get', 'post', 'delete', 'patch']
 
-    def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs['review_id'])
-
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all().order_by('id')
+        return self.get_parent().comments.all().order_by('id')
 
     def perform_create(self, serializer):
-        review = self.get_review()
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+    def perform_destroy(self, instance):
+        # У комментариев нет post_delete, см. api.signals.
+        instance.delete()
+        bump_now_and_on_commit(Comment._meta.model_name)
 
 
 class SignUpView(generics.CreateAPIView):
@@ -149,7 +504,7 @@ class TokenObtainView(generics.CreateAPIView):
         )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(QueryOptimizerMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserSerializer
     permission_classes = (IsSuperUserOrAdmin,)
@@ -165,14 +520,19 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def update_profile(self, request):
-        serializer = UserSerializer(request.user)
+        user = request.user
+        if user.get_deferred_fields():
+            # Пользователь собран из снимка в кэше (api.authentication),
+            # а профиль выводится и сохраняется целиком.
+            user = get_object_or_404(User, pk=user.pk)
+        serializer = UserSerializer(user)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True,
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.data)
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,6 +63,74 @@ DATABASES = {
     }
 }
 
+# Прагмы, которые reviews.db выполняет на каждом новом соединении SQLite.
+# WAL даёт читать во время записи, busy_timeout (мс) - ждать блокировку
+# вместо «database is locked»; cache_size < 0 задаётся в КиБ.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', -20000)),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'temp_store': 'memory',
+}
+
+# Реплика для чтения - копия основной базы, которую обновляет
+# `manage.py refreshreplica`. GET-запросы к каталогу и отзывам читают
+# с неё, если задан путь DATABASE_REPLICA_NAME. Пользователь, который
+# недавно писал, READ_AFTER_WRITE_SECONDS читает из основной базы;
+# окно должно быть больше периода обновления реплики.
+READ_REPLICA_ALIAS = 'replica'
+if os.getenv('DATABASE_REPLICA_NAME'):
+    DATABASES[READ_REPLICA_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DATABASE_REPLICA_NAME'),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['reviews.db.ReadReplicaRouter']
+READ_AFTER_WRITE_SECONDS = int(os.getenv('READ_AFTER_WRITE_SECONDS', 30))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Кэш ответов, счётчиков и версий ресурсов (api.cache). Версии сдвигаются
+# только в кэше процесса, обработавшего запись: при нескольких процессах
+# API_CACHE_ALIAS должен указывать на общий кэш (CACHE_BACKEND), иначе
+# остальные процессы отдают старые данные до истечения версии через
+# API_CACHE_TIMEOUT.
+API_CACHE_ALIAS = os.getenv('API_CACHE_ALIAS', 'default')
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 300))
+CATALOG_CACHE_CONTROL = 'public, max-age=60'
+
+# Наибольшее число SQL-запросов на маршрут, см. api.middleware.
+# Превышение пишется в лог api.queries, тесты держат маршруты в бюджете.
+QUERY_STATS_HEADERS = DEBUG
+QUERY_BUDGETS = {
+    'api-root': 1,
+    'signup': 6,
+    'token': 1,
+    'users-list': 3,
+    'users-detail': 2,
+    'users-update-profile': 1,
+    'categories-list': 3,
+    'categories-autocomplete': 2,
+    'genres-list': 3,
+    'genres-autocomplete': 2,
+    'titles-list': 4,
+    'titles-detail': 3,
+    'titles-facets': 4,
+    'reviews-list': 3,
+    'reviews-detail': 3,
+    'comments-list': 4,
+    'comments-detail': 3,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -91,14 +160,38 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+# В режиме JSON_ONLY браузерный API отключён: на любой Accept отдаётся JSON.
+JSON_ONLY = os.getenv('API_JSON_ONLY', str(not DEBUG)).lower() in (
+    'true', '1', 'yes'
+)
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+    ] + ([] if JSON_ONLY else [
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]),
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ]
 }
 
+# Проверенные токены и снимки пользователей для аутентификации, см.
+# api.authentication. Снимок сбрасывается при сохранении пользователя,
+# но только в кэше процесса, который его сохранил: пока кэш API не общий
+# для всех процессов (CACHE_BACKEND), срок снимка должен оставаться
+# коротким, иначе снятая роль или удалённый пользователь продолжат
+# действовать в остальных процессах до его истечения.
+AUTH_USER_CACHE_SECONDS = int(os.getenv('AUTH_USER_CACHE_SECONDS', 5))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 1024))
+
 AUTH_USER_MODEL = 'reviews.User'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
@@ -2,6 +2,8 @@ CHARACTER_QUANTITY = 20
 NAME_LENGTH = 256
 SLUG_LENGTH = 50
 USERNAME_LENGTH = 150
+# Слаги, занятые маршрутами API вида /categories/<действие>/.
+RESERVED_SLUGS = ('autocomplete',)
 EMAIL_LEHGTH = 254
 MAX_RATING = 10
 MIN_RATING = 1
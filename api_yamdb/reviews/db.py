@@ -0,0 +1,106 @@
+"""Настройка соединений с базой и маршрутизация чтений на реплику."""
+import contextvars
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+
+
+def set_pragmas(cursor, pragmas):
+    """Выполняет `PRAGMA имя = значение` для каждой пары из `pragmas`."""
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name):
+            raise ValueError(f'Неверное имя прагмы: {name!r}')
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def get_pragmas(cursor, names):
+    """Текущие значения прагм соединения.
+
+    Для неприменимых прагм (mmap_size у базы в памяти) - None.
+    """
+    values = {}
+    for name in names:
+        if not PRAGMA_NAME.match(name):
+            raise ValueError(f'Неверное имя прагмы: {name!r}')
+        cursor.execute(f'PRAGMA {name}')
+        row = cursor.fetchone()
+        values[name] = None if row is None else row[0]
+    return values
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Обработчик `connection_created`: профиль SQLITE_PRAGMAS."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        set_pragmas(cursor, settings.SQLITE_PRAGMAS)
+
+
+_read_database = contextvars.ContextVar('read_database', default=None)
+
+
+def get_replica_alias():
+    """Псевдоним реплики или None, если она не настроена."""
+    alias = settings.READ_REPLICA_ALIAS
+    return alias if alias in connections.databases else None
+
+
+def get_read_database():
+    return _read_database.get() or DEFAULT_DB_ALIAS
+
+
+def route_reads_to(alias):
+    """Направляет чтения текущего контекста в `alias`.
+
+    Действует до выхода из объемлющего `reading_from`.
+    """
+    _read_database.set(alias)
+
+
+@contextmanager
+def reading_from(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReadReplicaRouter:
+    """Чтения - в базу, выбранную для контекста, записи - в основную.
+
+    Вне `reading_from`/`route_reads_to` решение остаётся за Django,
+    то есть всё идёт в default. Реплика - копия основной базы, поэтому
+    миграции к ней не применяются.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db != settings.READ_REPLICA_ALIAS
+
+
+def copy_database(source, target):
+    """Копирует базу соединения `source` в файл базы `target`.
+
+    Используется backup API SQLite: копия согласована, а читатели
+    реплики видят новые данные со следующего запроса.
+    """
+    source.ensure_connection()
+    destination = sqlite3.connect(target.settings_dict['NAME'])
+    try:
+        source.connection.backup(destination)
+    finally:
+        destination.close()
@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 08:40
+
+from django.db import migrations
+
+from reviews import search
+
+
+def install_search(apps, schema_editor):
+    search.rebuild(schema_editor.connection)
+
+
+def uninstall_search(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_genretitle_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search, uninstall_search),
+    ]
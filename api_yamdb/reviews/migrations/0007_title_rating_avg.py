@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 10:12
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+
+from reviews import search
+
+
+def fill_rating_avg(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.update(rating_avg=Cast(
+        F('rating_sum'), FloatField()) / NullIf(F('rating_count'), 0))
+
+
+def install_search(apps, schema_editor):
+    # SQLite пересоздаёт таблицу при изменении схемы и теряет триггеры.
+    search.install(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, install_search),
+        migrations.AddField(
+            model_name='title',
+            name='rating_avg',
+            field=models.FloatField(editable=False, null=True, verbose_name='Средняя оценка'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating_avg', 'id'], name='title_rating_avg_id_idx'),
+        ),
+        migrations.RunPython(fill_rating_avg, migrations.RunPython.noop),
+        migrations.RunPython(install_search, migrations.RunPython.noop),
+    ]
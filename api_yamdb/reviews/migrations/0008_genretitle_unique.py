@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 11:05
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_genres(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    keep = GenreTitle.objects.values('genre', 'title').annotate(
+        keep_id=Min('id')).values('keep_id')
+    GenreTitle.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_rating_avg'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_genres, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='genretitle',
+            name='genretitle_genre_title_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='genretitle',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='genretitle_genre_title_unique'),
+        ),
+    ]
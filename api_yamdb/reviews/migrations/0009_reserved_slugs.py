@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+import reviews.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_genretitle_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='slug',
+            field=models.SlugField(
+                unique=True, validators=[reviews.validators.validate_slug],
+                verbose_name='Слаг'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='slug',
+            field=models.SlugField(
+                unique=True, validators=[reviews.validators.validate_slug],
+                verbose_name='Слаг'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 13:40
+
+from django.db import migrations
+
+USER_INDEX = 'user_username_nocase_idx'
+
+
+def create_username_index(apps, schema_editor):
+    # Поиск `=username` в UserViewSet - это LIKE без учёта регистра;
+    # SQLite ведёт его по индексу, только если тот в коллации NOCASE.
+    # IF NOT EXISTS: индекс уже есть в базах, где его создавала 0008.
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {USER_INDEX} '
+            'ON reviews_user (username COLLATE NOCASE)')
+
+
+def drop_username_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {USER_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_reserved_slugs'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_username_index, drop_username_index),
+    ]
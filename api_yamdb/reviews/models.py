@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.db import models
-from django.db.models import Avg
+from django.db.models import Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 
@@ -9,7 +10,8 @@ from reviews.constants import (CHARACTER_QUANTITY,
                                SLUG_LENGTH, MAX_RATING,
                                MIN_RATING, ROLES, USER,
                                USERNAME_LENGTH)
-from reviews.validators import validate_username, validate_year
+from reviews.validators import (validate_slug, validate_username,
+                                validate_year)
 
 
 class User(AbstractUser):
@@ -59,6 +61,9 @@ class User(AbstractUser):
         return self.role == 'user'
 
     class Meta:
+        # На SQLite у username есть ещё индекс user_username_nocase_idx
+        # (COLLATE NOCASE) для поиска без учёта регистра; он создаётся
+        # сырым SQL в миграции 0010 и в состоянии модели не описан.
         ordering = ('id',)
         verbose_name = 'пользователь'
         verbose_name_plural = 'пользователи'
@@ -69,7 +74,7 @@ class User(AbstractUser):
 
 class SlugNameModel(models.Model):
     slug = models.SlugField('Слаг', max_length=SLUG_LENGTH,
-                            unique=True)
+                            unique=True, validators=[validate_slug])
     name = models.CharField('Название', max_length=NAME_LENGTH,
                             unique=True)
 
@@ -107,9 +112,20 @@ class Title(models.Model):
     category = models.ForeignKey(Category, verbose_name='Категория',
                                  on_delete=models.SET_NULL,
                                  null=True)
+    rating_sum = models.PositiveIntegerField('Сумма оценок', default=0,
+                                             editable=False)
+    rating_count = models.PositiveIntegerField('Количество оценок',
+                                               default=0, editable=False)
+    rating_avg = models.FloatField('Средняя оценка', null=True,
+                                   editable=False)
 
     class Meta:
         ordering = ('year',)
+        indexes = (
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+            models.Index(fields=('rating_avg', 'id'),
+                         name='title_rating_avg_id_idx'),
+        )
         verbose_name = 'произведение'
         verbose_name_plural = 'произведения'
         default_related_name = 'titles'
@@ -123,13 +139,85 @@ class Title(models.Model):
 
     @property
     def rating(self):
-        return self.reviews.values('score').aggregate(rating=Avg('score'))[
-            'rating']
+        if '_rating' not in self.__dict__:
+            self.load_ratings([self])
+        return self._rating
 
     @rating.setter
     def rating(self, value):
         self._rating = value
 
+    def refresh_from_db(self, *args, **kwargs):
+        self.__dict__.pop('_rating', None)
+        super().refresh_from_db(*args, **kwargs)
+
+    @staticmethod
+    def average(rating_sum, rating_count):
+        """Выражение средней оценки; NULL, пока оценок нет."""
+        return Cast(rating_sum, FloatField()) / NullIf(rating_count, 0)
+
+    @staticmethod
+    def calculate_rating(rating_sum, rating_count):
+        if not rating_count:
+            return None
+        return rating_sum / rating_count
+
+    @classmethod
+    def load_ratings(cls, titles):
+        """Проставляет рейтинг набору произведений.
+
+        Аннотированное значение не трогается, загруженные счётчики
+        считаются на месте, а для отложенных (only/defer) счётчики
+        догружаются одним запросом на весь набор.
+        """
+        counters = {'rating_sum', 'rating_count'}
+        missing = {}
+        for title in titles:
+            if '_rating' in title.__dict__:
+                continue
+            if counters & title.get_deferred_fields():
+                missing[title.pk] = title
+                continue
+            title._rating = cls.calculate_rating(
+                title.rating_sum, title.rating_count)
+        if not missing:
+            return
+        rows = cls.objects.filter(pk__in=missing).values_list(
+            'pk', 'rating_sum', 'rating_count')
+        for pk, rating_sum, rating_count in rows:
+            missing.pop(pk)._rating = cls.calculate_rating(
+                rating_sum, rating_count)
+        for title in missing.values():
+            title._rating = None
+
+    @classmethod
+    def update_rating(cls, title_id, score, count=0):
+        """Сдвигает счётчики оценок одним UPDATE без чтения строки.
+
+        Средняя оценка считается в том же UPDATE из старых значений
+        счётчиков, поэтому всегда совпадает с ними.
+        """
+        cls.objects.filter(pk=title_id).update(
+            rating_sum=F('rating_sum') + score,
+            rating_count=F('rating_count') + count,
+            rating_avg=cls.average(F('rating_sum') + score,
+                                   F('rating_count') + count)
+        )
+
+    @classmethod
+    def recount_ratings(cls, **filters):
+        """Пересчитывает счётчики оценок по отзывам."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')).order_by().values('title')
+        cls.objects.filter(**filters).update(
+            rating_sum=Coalesce(Subquery(
+                reviews.annotate(total=Sum('score')).values('total')), 0),
+            rating_count=Coalesce(Subquery(
+                reviews.annotate(total=Count('id')).values('total')), 0)
+        )
+        cls.objects.filter(**filters).update(
+            rating_avg=cls.average(F('rating_sum'), F('rating_count')))
+
 
 class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.SET_NULL,
@@ -141,6 +229,14 @@ class GenreTitle(models.Model):
         verbose_name = 'жанр'
         verbose_name_plural = 'жанры'
         ordering = ('genre',)
+        constraints = (
+            models.UniqueConstraint(fields=('genre', 'title'),
+                                    name='genretitle_genre_title_unique'),
+        )
+        indexes = (
+            models.Index(fields=('title', 'genre'),
+                         name='genretitle_title_genre_idx'),
+        )
 
     def __str__(self):
         return f'{self.genre}'
@@ -203,6 +299,9 @@ class Review(ReviewCommentContent):
                 name='one_author_one_title'
             )
         ]
+        indexes = (
+            models.Index(fields=('title', 'id'), name='review_title_id_idx'),
+        )
         verbose_name = 'отзыв'
         verbose_name_plural = 'отзывы'
 
@@ -216,5 +315,9 @@ class Comment(ReviewCommentContent):
     )
 
     class Meta(ReviewCommentContent.Meta):
+        indexes = (
+            models.Index(fields=('review', 'id'),
+                         name='comment_review_id_idx'),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
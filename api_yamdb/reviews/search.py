@@ -0,0 +1,92 @@
+"""Полнотекстовый поиск произведений на SQLite FTS5.
+
+Индекс хранит название и описание, приведённые к одному виду: регистр
+сворачивает токенизатор unicode61 (в том числе для кириллицы), а «ё»
+заменяется на «е» и в индексе, и в запросе. Синхронизацию держат
+триггеры на reviews_title, поэтому индекс видит и queryset.update(),
+и bulk_create. SQLite пересоздаёт таблицу при изменении её схемы и
+теряет триггеры: миграции, меняющие Title, должны вызывать `install`.
+"""
+import re
+
+FTS_TABLE = 'reviews_title_fts'
+TITLE_TABLE = 'reviews_title'
+
+
+def _normalize_sql(column):
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _insert_sql(prefix):
+    return (
+        f'INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES '
+        f'({prefix}.id, {_normalize_sql(f"{prefix}.name")}, '
+        f'{_normalize_sql(f"{prefix}.description")});'
+    )
+
+
+INSTALL_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    "name, description, tokenize='unicode61 remove_diacritics 2')",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert '
+    f'AFTER INSERT ON {TITLE_TABLE} BEGIN {_insert_sql("new")} END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete '
+    f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+    f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id; END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update '
+    f'AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN '
+    f'DELETE FROM {FTS_TABLE} WHERE rowid = old.id; '
+    f'{_insert_sql("new")} END',
+)
+UNINSTALL_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+REBUILD_SQL = (
+    f'DELETE FROM {FTS_TABLE}',
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f'SELECT id, {_normalize_sql("name")}, {_normalize_sql("description")} '
+    f'FROM {TITLE_TABLE}',
+)
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def _execute(connection, statements):
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def install(connection):
+    _execute(connection, INSTALL_SQL)
+
+
+def uninstall(connection):
+    _execute(connection, UNINSTALL_SQL)
+
+
+def rebuild(connection):
+    _execute(connection, INSTALL_SQL + REBUILD_SQL)
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def match_query(text):
+    """Запрос FTS5 из пользовательского текста или None, если слов нет.
+
+    Каждое слово ищется как префикс, все слова обязательны; кавычки и
+    операторы FTS5 из ввода не проходят.
+    """
+    words = re.findall(r'\w+', normalize(text))
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
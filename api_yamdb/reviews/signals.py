@@ -0,0 +1,109 @@
+"""Счётчики оценок произведения следуют за отзывами.
+
+Приёмники срабатывают при любом save()/delete() отзыва, в том числе
+при каскадном удалении пользователя или произведения и в админке.
+bulk_create и queryset.update() сигналов не шлют: после них нужен
+`Title.recount_ratings`.
+"""
+import threading
+
+from django.core.signals import request_finished
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+
+
+@receiver(pre_save, sender=Review)
+def remember_rated_score(sender, instance, raw, **kwargs):
+    """Запоминает оценку и произведение, записанные в базе до правки.
+
+    Значения перечитываются в транзакции сохранения (с блокировкой
+    строки, где база её поддерживает), а не берутся из экземпляра,
+    загруженного раньше: иначе параллельные правки сдвинули бы счётчики
+    от устаревшей оценки.
+    """
+    instance._rated = None
+    if raw or instance._state.adding:
+        return
+    reviews = Review.objects.filter(pk=instance.pk)
+    if transaction.get_connection().in_atomic_block:
+        reviews = reviews.select_for_update()
+    instance._rated = reviews.values_list('title_id', 'score').first()
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        Title.update_rating(instance.title_id, instance.score, 1)
+        return
+    rated = getattr(instance, '_rated', None)
+    if rated is None:
+        return
+    title_id, score = rated
+    if title_id != instance.title_id:
+        Title.update_rating(title_id, -score, -1)
+        Title.update_rating(instance.title_id, instance.score, 1)
+    elif score != instance.score:
+        Title.update_rating(title_id, instance.score - score)
+
+
+class PendingRecounts(threading.local):
+    """Произведения, ждущие пересчёта после коммита, по потокам.
+
+    `deleting` - произведения, удаляемые прямо сейчас: их отзывы
+    удаляются каскадом, и пересчитывать строку, которая сейчас исчезнет,
+    незачем.
+    """
+
+    def __init__(self):
+        self.titles = set()
+        self.deleting = set()
+
+
+pending = PendingRecounts()
+
+
+def recount_pending():
+    title_ids, pending.titles = pending.titles, set()
+    if title_ids:
+        Title.recount_ratings(pk__in=title_ids)
+
+
+@receiver(pre_delete, sender=Title)
+def skip_deleted_title(sender, instance, **kwargs):
+    pending.deleting.add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def forget_deleted_title(sender, instance, **kwargs):
+    pending.deleting.discard(instance.pk)
+
+
+@receiver(request_finished)
+def forget_failed_deletes(**kwargs):
+    # Если удаление произведения упало между pre_delete и post_delete,
+    # отметка не должна пережить запрос и отключить пересчёт навсегда.
+    pending.deleting.clear()
+
+
+@receiver(post_delete, sender=Review)
+def recount_title_rating(sender, instance, **kwargs):
+    """После удаления счётчики пересчитываются по оставшимся отзывам.
+
+    Сигнал приходит и тогда, когда строку уже удалил параллельный
+    запрос, так что вычитать оценку небезопасно: пересчёт даёт верный
+    результат при любом числе повторов. Каскад (удаление пользователя)
+    шлёт сигнал на каждый отзыв, поэтому произведения копятся и
+    пересчитываются одним запросом после коммита. Если транзакция
+    откатилась, лишние id просто пересчитаются со следующим удалением.
+    """
+    if instance.title_id in pending.deleting:
+        return
+    pending.titles.add(instance.title_id)
+    transaction.on_commit(recount_pending)
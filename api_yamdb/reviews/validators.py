@@ -3,6 +3,8 @@ import re
 
 from django.core.exceptions import ValidationError
 
+from reviews.constants import RESERVED_SLUGS
+
 
 def validate_username(value):
     if value == 'me':
@@ -16,6 +18,14 @@ def validate_username(value):
     return value
 
 
+def validate_slug(value):
+    if value in RESERVED_SLUGS:
+        raise ValidationError(
+            f'Слаг не может быть "{value}"'
+        )
+    return value
+
+
 def validate_year(value):
     if value > datetime.today().year:
         raise ValidationError(
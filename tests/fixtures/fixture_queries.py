@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title, User
+)
+
+
+@pytest.fixture
+def count_queries(settings):
+    """Число SQL-запросов из заголовка X-Query-Count и сам ответ."""
+    settings.QUERY_STATS_HEADERS = True
+
+    def count(client, url, method='get', data=None):
+        response = getattr(client, method)(url, data=data)
+        assert response.status_code < 400, (
+            f'{method.upper()}-запрос к `{url}` вернул '
+            f'{response.status_code}.'
+        )
+        return int(response['X-Query-Count']), response
+
+    return count
+
+
+def fill_slug_names(model, prefix, rows):
+    model.objects.bulk_create(
+        model(name=f'{prefix} {number}', slug=f'{prefix}{number}')
+        for number in range(model.objects.count(), rows)
+    )
+
+
+@pytest.fixture
+def catalog():
+    """Каталог, который `catalog.fill(rows)` доводит до `rows` строк.
+
+    Растут все таблицы: категории, жанры, пользователи, произведения,
+    отзывы на первое произведение и комментарии к первому отзыву.
+    Строки вставляются через bulk_create без сигналов, поэтому кэш
+    API после заполнения очищается.
+    """
+    def fill(rows):
+        fill_slug_names(Category, 'category', rows)
+        fill_slug_names(Genre, 'genre', rows)
+        User.objects.bulk_create(
+            User(username=f'reader{number}', email=f'reader{number}@y.fake')
+            for number in range(User.objects.count(), rows)
+        )
+        category = Category.objects.order_by('id').first()
+        genre = Genre.objects.order_by('id').first()
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=1900 + number % 100,
+                  category=category)
+            for number in range(Title.objects.count(), rows)
+        )
+        GenreTitle.objects.bulk_create(
+            GenreTitle(genre=genre, title=title)
+            for title in Title.objects.exclude(
+                id__in=GenreTitle.objects.values('title_id'))
+        )
+        title = Title.objects.order_by('id').first()
+        authors = list(User.objects.exclude(
+            id__in=title.reviews.values('author_id')
+        )[:rows - title.reviews.count()])
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=7)
+            for author in authors
+        )
+        review = title.reviews.order_by('id').first()
+        users = list(User.objects.order_by('id')[:rows])
+        Comment.objects.bulk_create(
+            Comment(review=review, author=users[number % len(users)],
+                    text='Комментарий')
+            for number in range(review.comments.count(), rows)
+        )
+        Title.recount_ratings(pk=title.pk)
+        cache.clear()
+        catalog.title_id = title.id
+        catalog.review_id = review.id
+        catalog.comment_id = review.comments.order_by('id').first().id
+        catalog.username = users[0].username
+
+    catalog = SimpleNamespace(fill=fill)
+    return catalog
@@ -0,0 +1,174 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @staticmethod
+    def collect(client, url, link):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            ids.append([item['id'] for item in data['results']])
+            url = data[link]
+        return ids
+
+    def test_01_titles_cursor_walk(self, client):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(12):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000 + number % 3
+            )
+            if number % 2:
+                title.genre.add(genre)
+        expected = list(
+            Title.objects.order_by('year', 'id').values_list('id', flat=True)
+        )
+
+        pages = self.collect(
+            client, f'{self.TITLES_URL}?pagination=cursor', 'next'
+        )
+        assert [pk for page in pages for pk in page] == expected, (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'отдаёт все произведения по порядку `(year, id)` без повторов.'
+        )
+        assert [len(page) for page in pages] == [5, 5, 2]
+
+        response = client.get(f'{self.TITLES_URL}?pagination=cursor')
+        last_url = response.json()['next']
+        last_url = client.get(last_url).json()['next']
+        previous = client.get(last_url).json()['previous']
+        back = self.collect(client, previous, 'previous')
+        assert [pk for page in reversed(back) for pk in page] == (
+            expected[:10]
+        ), (
+            'Проверьте, что ссылка `previous` курсорной пагинации ведёт '
+            'на предыдущие страницы в прежнем порядке.'
+        )
+
+    def test_02_titles_cursor_with_filters(self, client):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(8):
+            title = Title.objects.create(name='Имя', year=1990 + number)
+            if number % 2:
+                title.genre.add(genre)
+        pages = self.collect(
+            client,
+            f'{self.TITLES_URL}?pagination=cursor&genre=drama&name=Имя',
+            'next'
+        )
+        assert sum(len(page) for page in pages) == 4
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('position', (
+        ['abc', 1], [[1], 1], [None, None], [2000, {'id': 1}],
+    ))
+    def test_03_tampered_cursor(self, client, position):
+        Title.objects.create(name='Произведение', year=2000)
+        cursor = base64.urlsafe_b64encode(
+            json.dumps([0, position]).encode()).decode()
+        response = client.get(f'{self.TITLES_URL}?cursor={cursor}')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Курсор с подменёнными значениями должен давать 404, '
+            'а не ошибку сервера.'
+        )
+
+    @pytest.mark.parametrize('params', (
+        {'pagination': 'cursor', 'ordering': '-rating'},
+        {'pagination': 'cursor', 'search': 'Произведение'},
+    ))
+    def test_03_cursor_rejects_own_ordering(self, client, params):
+        Title.objects.create(name='Произведение', year=2000)
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Курсор идёт по (year, id): `ordering` и `search` с ним должны '
+            'давать 400, а не молча терять свой порядок.'
+        )
+        response = client.get(self.TITLES_URL, {
+            'pagination': 'cursor', 'ordering': '', 'search': ' '})
+        assert response.status_code == HTTPStatus.OK
+
+    def test_04_reviews_and_comments_cursor_walk(self, client,
+                                                 django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        other = Title.objects.create(name='Другое', year=2001)
+        reviews = []
+        for number in range(7):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake'
+            )
+            reviews.append(Review.objects.create(
+                title=title, author=author, text='текст', score=5
+            ))
+            Review.objects.create(
+                title=other, author=author, text='текст', score=5
+            )
+            Comment.objects.create(
+                review=reviews[0], author=author, text='текст'
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/?pagination=cursor'
+        pages = self.collect(client, url, 'next')
+        assert [pk for page in pages for pk in page] == [
+            review.id for review in reviews
+        ], (
+            'Проверьте, что курсорная пагинация отзывов отдаёт только '
+            'отзывы произведения, по порядку `id` и без повторов.'
+        )
+        url = (
+            f'/api/v1/titles/{title.id}/reviews/{reviews[0].id}/comments/'
+            '?pagination=cursor'
+        )
+        pages = self.collect(client, url, 'next')
+        assert [len(page) for page in pages] == [5, 2]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08CountPagination:
+
+    CATEGORY_URL = '/api/v1/categories/'
+
+    def test_01_count_opt_out(self, client):
+        for number in range(6):
+            Category.objects.create(name=f'Категория {number}',
+                                    slug=f'category{number}')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.CATEGORY_URL}?count=false')
+        data = response.json()
+        assert 'count' not in data and len(data['results']) == 5
+        assert data['next'] and data['previous'] is None
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что с `?count=false` список отдаётся одним запросом.'
+        )
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 1 and data['next'] is None
+
+    def test_02_count_cached_until_write(self, client, admin_client):
+        Category.objects.create(name='Фильм', slug='films')
+        assert client.get(self.CATEGORY_URL).json()['count'] == 1
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.CATEGORY_URL}?page=1')
+        assert response.json()['count'] == 1
+        assert len(context.captured_queries) == 1, (
+            'Проверьте, что повторный запрос списка берёт `count` из кэша.'
+        )
+        admin_client.post(self.CATEGORY_URL,
+                          data={'name': 'Книги', 'slug': 'books'})
+        assert client.get(self.CATEGORY_URL).json()['count'] == 2, (
+            'Проверьте, что запись в таблицу сбрасывает закэшированный '
+            '`count`.'
+        )
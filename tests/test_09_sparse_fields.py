@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        category = Category.objects.create(name='Фильм', slug='films')
+        for number in range(3):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.add(genre)
+
+    def test_01_titles_fields(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.TITLES_URL}?fields=id,name,year')
+        assert response.status_code == HTTPStatus.OK
+        for item in response.json()['results']:
+            assert set(item) == {'id', 'name', 'year'}, (
+                'Проверьте, что параметр `fields` оставляет в ответе '
+                f'`{self.TITLES_URL}` только перечисленные поля.'
+            )
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'reviews_genre' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что без полей `genre` и `category` связанные '
+            'таблицы не запрашиваются.'
+        )
+        assert 'description' not in sql
+
+    def test_02_titles_without_fields(self, client, titles):
+        item = client.get(self.TITLES_URL).json()['results'][0]
+        assert set(item) == {
+            'id', 'name', 'year', 'description', 'genre', 'category',
+            'rating'
+        }
+
+    def test_03_fields_ignored_on_write(self, admin_client, titles):
+        response = admin_client.post(
+            f'{self.TITLES_URL}?fields=id',
+            data={'name': 'Новое', 'year': 2001, 'genre': ['drama'],
+                  'category': 'films'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'genre' in response.json()
+
+    @pytest.mark.parametrize('value', ('', ' , ,'))
+    def test_04_empty_fields(self, client, titles, value):
+        response = client.get(self.TITLES_URL, {'fields': value})
+        assert response.status_code == HTTPStatus.OK
+        item = response.json()['results'][0]
+        assert 'genre' in item and 'name' in item, (
+            'Проверьте, что пустой параметр `fields` не урезает ответ.'
+        )
+
+    @pytest.mark.parametrize('url', (
+        TITLES_URL, f'{TITLES_URL}export/', TITLES_URL + '{title_id}/reviews/'
+    ))
+    def test_05_unknown_fields(self, client, titles, url):
+        url = url.format(title_id=Title.objects.first().id)
+        response = client.get(url, {'fields': 'id,unknown'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{url}` отвечает 400 на неизвестные поля '
+            'в `fields`, а не отдаёт пустые объекты.'
+        )
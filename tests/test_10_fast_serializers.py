@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    FastReviewSerializer, FastTitleSerializer, ReadTitleSerializer,
+    ReviewSerializer
+)
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10FastSerializers:
+
+    @staticmethod
+    def render(serializer_class, objects):
+        return JSONRenderer().render(
+            serializer_class(objects, many=True).data
+        )
+
+    def test_01_titles_identical(self, user):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        rated = Title.objects.create(
+            name='Оценённое', year=1999, description='Описание',
+            category=category, rating_sum=19, rating_count=2
+        )
+        rated.genre.add(genre)
+        Title.objects.create(name='Без категории', year=2000)
+        titles = list(
+            Title.objects.select_related('category').prefetch_related('genre')
+        )
+        assert self.render(ReadTitleSerializer, titles) == self.render(
+            FastTitleSerializer, titles
+        ), 'FastTitleSerializer должен выдавать тот же JSON.'
+
+    def test_02_reviews_identical(self, user, admin):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for author in (user, admin):
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=7
+            )
+        reviews = list(Review.objects.select_related('author'))
+        assert self.render(ReviewSerializer, reviews) == self.render(
+            FastReviewSerializer, reviews
+        ), 'FastReviewSerializer должен выдавать тот же JSON.'
+
+    def test_03_fast_renderer_identical(self):
+        data = {
+            'results': [
+                {'id': 1, 'name': 'Ёжик в тумане\u2028', 'rating': None,
+                 'genre': [{'name': 'Мультфильм', 'slug': 'cartoon'}]}
+            ],
+            'count': 1,
+        }
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(
+            data
+        ), 'FastJSONRenderer должен выдавать тот же JSON.'
+
+    def test_04_fast_parser(self, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/', data='{"name": "Драма", "slug": "drama"}',
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = admin_client.post(
+            '/api/v1/genres/', data='{broken',
+            content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,140 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Genre, Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_repeated_get_served_from_cache(self, client):
+        Genre.objects.create(name='Драма', slug='drama')
+        first = client.get('/api/v1/genres/?search=Др').json()
+        with CaptureQueriesContext(connection) as context:
+            second = client.get('/api/v1/genres/?search=Др').json()
+        assert first == second
+        assert not context.captured_queries, (
+            'Проверьте, что повторный GET-запрос к `/api/v1/genres/` '
+            'отдаётся из кэша без запросов к БД.'
+        )
+
+    def test_02_writes_invalidate(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        client.get(self.TITLES_URL)
+
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        assert client.get(url).json()['rating'] == 7, (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений.'
+        )
+
+        admin_client.patch(url, data={'name': 'Новое имя'})
+        names = {
+            item['name'] for item in client.get(self.TITLES_URL).json()[
+                'results']
+        }
+        assert 'Новое имя' in names, (
+            'Проверьте, что изменение произведения сбрасывает кэш списка.'
+        )
+
+    def test_03_conditional_get(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        for url in (
+            '/api/v1/categories/',
+            self.TITLES_URL,
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/',
+        ):
+            response = client.get(url)
+            etag = response['ETag']
+            assert etag, f'Проверьте, что ответ `{url}` содержит ETag.'
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с совпавшим '
+                'If-None-Match возвращает 304.'
+            )
+            assert not response.content
+
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после нового отзыва ETag списка отзывов меняется.'
+        )
+        assert response['ETag'] != etag
+
+    def test_04_cache_control(self, client):
+        response = client.get('/api/v1/genres/')
+        assert 'max-age' in response['Cache-Control']
+
+    @pytest.fixture
+    def review(self, admin, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(title=title, author=admin,
+                                       text='Отзыв', score=5)
+        Comment.objects.bulk_create(
+            Comment(review=review, author=user, text=f'Комментарий {number}')
+            for number in range(50)
+        )
+        return review
+
+    def test_05_cascade_keeps_fast_delete(self, review):
+        with CaptureQueriesContext(connection) as context:
+            review.delete()
+        comment_sql = [
+            query['sql'] for query in context.captured_queries
+            if '"reviews_comment"' in query['sql']
+        ]
+        assert len(comment_sql) == 1 and comment_sql[0].startswith(
+            'DELETE'), (
+            'Комментарии удаляемого отзыва должны удаляться одним DELETE, '
+            f'без выборки строк ради сигналов: {comment_sql}'
+        )
+        assert not Comment.objects.exists()
+
+    def test_06_comment_deletes_invalidate(self, client, user_client,
+                                           admin_client, user, review):
+        url = (f'{self.TITLES_URL}{review.title_id}/reviews/'
+               f'{review.id}/comments/')
+        assert client.get(url).json()['count'] == 50
+        comment = review.comments.first()
+        response = user_client.delete(f'{url}{comment.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(url).json()['count'] == 49, (
+            'Проверьте, что удаление комментария сбрасывает кэш счётчика.'
+        )
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что каскадное удаление комментариев вместе с '
+            'автором сбрасывает кэш счётчика.'
+        )
+
+    def test_07_versions_expire(self, client, settings):
+        settings.API_CACHE_TIMEOUT = 1
+        Genre.objects.create(name='Драма', slug='drama')
+        url = '/api/v1/genres/'
+        etag = client.get(url)['ETag']
+        assert client.get(
+            '/api/v1/genres/autocomplete/', {'q': 'др'}).json()
+        # Так выглядит запись в другом процессе: сигнал сюда не доходит.
+        Genre.objects.filter(slug='drama').update(name='Комедия')
+        time.sleep(1.1)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии ресурсов истекают через '
+            'API_CACHE_TIMEOUT и ETag не остаётся прежним навсегда.'
+        )
+        assert response.json()['results'][0]['name'] == 'Комедия'
+        assert client.get(
+            '/api/v1/genres/autocomplete/', {'q': 'ком'}).json(), (
+            'Проверьте, что индекс подсказок перестраивается после '
+            'истечения версии.'
+        )
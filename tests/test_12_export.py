@@ -0,0 +1,50 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from api.views import TitleViewSet
+from reviews.models import Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitlesExport:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def test_01_export_streams_all_titles(self, client, monkeypatch):
+        monkeypatch.setattr(TitleViewSet, 'export_chunk_size', 3)
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(8):
+            title = Title.objects.create(name=f'Имя {number}', year=2000)
+            if number % 2:
+                title.genre.add(drama)
+
+        response = client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{self.EXPORT_URL}` не найден или недоступен.'
+        )
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert [row['name'] for row in rows] == [
+            f'Имя {number}' for number in range(8)
+        ], (
+            f'Проверьте, что `{self.EXPORT_URL}` отдаёт все произведения '
+            'по одному JSON-объекту на строку.'
+        )
+        assert rows[1]['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+
+    def test_02_export_respects_filters(self, client):
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        for number in range(4):
+            title = Title.objects.create(name=f'Имя {number}', year=2000)
+            if number % 2:
+                title.genre.add(drama)
+        response = client.get(f'{self.EXPORT_URL}?genre=drama&fields=id')
+        lines = b''.join(response.streaming_content).splitlines()
+        assert len(lines) == 2
+        assert set(json.loads(lines[0])) == {'id'}
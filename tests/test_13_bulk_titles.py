@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13BulkTitles:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self):
+        Category.objects.create(name='Фильм', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    @staticmethod
+    def payload(count):
+        return [
+            {
+                'name': f'Произведение {number}',
+                'year': 2000 + number,
+                'genre': ['drama', 'comedy'] if number % 2 else ['drama'],
+                'category': 'films',
+            }
+            for number in range(count)
+        ]
+
+    def test_01_bulk_create(self, admin_client, catalog):
+        with CaptureQueriesContext(connection) as small:
+            response = admin_client.post(
+                self.TITLES_URL, data=self.payload(2), format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос со списком к `{self.TITLES_URL}` '
+            'создаёт все произведения и возвращает статус 201.'
+        )
+        data = response.json()
+        assert [item['name'] for item in data] == [
+            'Произведение 0', 'Произведение 1'
+        ]
+        assert [len(item['genre']) for item in data] == [1, 2]
+        # Оба запроса - с холодным кэшем пользователя для аутентификации.
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            admin_client.post(
+                self.TITLES_URL, data=self.payload(20), format='json'
+            )
+        assert len(large.captured_queries) == len(small.captured_queries), (
+            'Проверьте, что число запросов пакетного создания не зависит '
+            'от количества произведений.'
+        )
+        assert Title.objects.count() == 22
+        assert GenreTitle.objects.count() == 33
+
+    def test_02_bulk_create_errors_per_item(self, admin_client, catalog):
+        payload = self.payload(3)
+        payload[1]['genre'] = ['unknown']
+        payload[2]['year'] = 'год'
+        response = admin_client.post(
+            self.TITLES_URL, data=payload, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'genre' in errors[1] and 'year' in errors[2], (
+            'Проверьте, что ошибки пакетного создания возвращаются '
+            'по каждому элементу списка.'
+        )
+        assert not Title.objects.exists()
+
+    def test_03_bulk_create_admin_only(self, user_client, catalog):
+        response = user_client.post(
+            self.TITLES_URL, data=self.payload(1), format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
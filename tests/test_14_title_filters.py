@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import GenreCategoryFilterBackend
+from reviews.models import Category, Genre, Title
+from tests.utils import explain
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def catalog(self):
+        films = Category.objects.create(name='Фильм', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        horror = Genre.objects.create(name='Ужасы', slug='horror')
+        layout = {
+            'Обе': ((drama, comedy), films),
+            'Драма': ((drama,), books),
+            'Комедия': ((comedy,), films),
+            'Ужасы': ((horror,), books),
+        }
+        for name, (genres, category) in layout.items():
+            title = Title.objects.create(
+                name=name, year=2000, category=category
+            )
+            title.genre.set(genres)
+
+    def names(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return sorted(item['name'] for item in response.json()['results'])
+
+    def test_01_or_and_semantics(self, client, catalog):
+        assert self.names(client, 'genre=drama,comedy') == [
+            'Драма', 'Комедия', 'Обе'
+        ], (
+            'Проверьте, что `genre=a,b` возвращает произведения с любым из '
+            'жанров и без повторов.'
+        )
+        assert self.names(client, 'genre=drama,comedy&genre_mode=and') == [
+            'Обе'
+        ], 'Проверьте, что `genre_mode=and` требует все жанры сразу.'
+        assert self.names(client, 'category=films,books') == [
+            'Драма', 'Комедия', 'Обе', 'Ужасы'
+        ]
+        assert self.names(client, 'category=films,books&category_mode=and') == []
+        assert self.names(client, 'genre=drama&category=films') == ['Обе']
+
+    def test_02_invalid_mode(self, client, catalog):
+        response = client.get(f'{self.TITLES_URL}?genre=drama&genre_mode=xor')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.parametrize('query, index', (
+        ('genre=drama,comedy', 'sqlite_autoindex_reviews_genretitle_1'),
+        ('genre=drama,comedy&genre_mode=and',
+         'sqlite_autoindex_reviews_genretitle_1'),
+    ))
+    def test_03_query_plan_uses_indexes(self, query, index):
+        request = Request(APIRequestFactory().get(f'/?{query}'))
+        queryset = GenreCategoryFilterBackend().filter_queryset(
+            request, Title.objects.order_by('year'), None
+        )
+        plan = explain(queryset)
+        assert any(index in step for step in plan), (
+            f'Фильтр `{query}` должен использовать индекс `{index}`: {plan}'
+        )
+        assert not any(
+            step.startswith('SCAN') and 'USING' not in step for step in plan
+        ), f'Фильтр `{query}` не должен полностью сканировать таблицы: {plan}'
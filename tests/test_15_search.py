@@ -0,0 +1,77 @@
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from api.filters import TitleSearchFilterBackend
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        Title.objects.create(name='Война и мир', year=1869,
+                             description='Роман-эпопея')
+        Title.objects.create(name='ЁЖИК В ТУМАНЕ', year=1975,
+                             description='Мультфильм про ёжика')
+        Title.objects.create(name='Мир', year=2000, description='Про войну')
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [item['name'] for item in response.json()['results']]
+
+    def test_01_search_case_folding(self, client, titles):
+        assert self.search(client, 'ВОЙНА') == ['Война и мир'], (
+            'Проверьте, что поиск по `search` не зависит от регистра '
+            'кириллицы.'
+        )
+        assert self.search(client, 'ежик') == ['ЁЖИК В ТУМАНЕ'], (
+            'Проверьте, что поиск не различает «е» и «ё».'
+        )
+        assert self.search(client, 'мультфильм') == ['ЁЖИК В ТУМАНЕ']
+
+    def test_02_search_ranked_prefix(self, client, titles):
+        assert set(self.search(client, 'вой')) == {'Война и мир', 'Мир'}
+        assert self.search(client, 'мир')[0] == 'Мир', (
+            'Проверьте, что результаты поиска упорядочены по релевантности.'
+        )
+        assert self.search(client, '"*)(') == []
+
+    def test_03_index_follows_writes(self, client, titles):
+        title = Title.objects.get(name='Мир')
+        title.name = 'Покой'
+        title.save()
+        assert 'Покой' in self.search(client, 'покой')
+        Title.objects.filter(pk=title.pk).delete()
+        assert self.search(client, 'покой') == []
+
+    def test_04_rebuild_command(self, client, titles):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_title_fts')
+        assert self.search(client, 'война') == []
+        call_command('rebuildsearch')
+        assert self.search(client, 'война') == ['Война и мир']
+
+    def test_05_search_composes(self, client, titles):
+        Title.objects.filter(name='Мир').update(year=1700)
+        response = client.get(self.TITLES_URL,
+                              {'search': 'вой', 'ordering': 'year'})
+        assert [item['name'] for item in response.json()['results']] == [
+            'Мир', 'Война и мир'
+        ], 'Проверьте, что `ordering` заменяет порядок по релевантности.'
+        response = client.get(f'{self.TITLES_URL}facets/', {'search': 'вой'})
+        assert response.json()['count'] == 2
+        backend = TitleSearchFilterBackend()
+        request = SimpleNamespace(query_params={'search': 'мир'})
+        queryset = backend.filter_queryset(
+            request, Title.objects.all(), None)
+        assert list(queryset.only('id').values_list('name', flat=True)) == [
+            'Мир', 'Война и мир'
+        ], 'Проверьте, что поиск сочетается с only() и values().'
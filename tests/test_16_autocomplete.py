@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Autocomplete:
+
+    @pytest.fixture
+    def genres(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Научная фантастика', slug='sci-fi')
+        Genre.objects.create(name='Фэнтези', slug='fantasy')
+        Genre.objects.create(name='Ёрш и компания', slug='yorsh')
+
+    def suggest(self, client, url, **params):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает 200.'
+        )
+        return [item['slug'] for item in response.json()]
+
+    def test_01_prefix_match(self, client, genres):
+        url = '/api/v1/genres/autocomplete/'
+        assert self.suggest(client, url, q='ДР') == ['drama'], (
+            'Проверьте, что подсказки ищут по началу названия '
+            'без учёта регистра.'
+        )
+        assert self.suggest(client, url, q='фан') == ['sci-fi'], (
+            'Проверьте, что подсказки находят начало любого слова названия.'
+        )
+        assert self.suggest(client, url, q='fa') == ['fantasy'], (
+            'Проверьте, что подсказки ищут по началу слага.'
+        )
+        assert self.suggest(client, url, q='ерш') == ['yorsh'], (
+            'Проверьте, что в подсказках «ё» и «е» не различаются.'
+        )
+        assert self.suggest(client, url, q='') == []
+        assert self.suggest(client, url, q='рама') == [], (
+            'Проверьте, что подсказки не ищут по середине слова.'
+        )
+
+    def test_02_limit(self, client):
+        for number in range(5):
+            Category.objects.create(
+                name=f'Кино {number}', slug=f'kino{number}')
+        url = '/api/v1/categories/autocomplete/'
+        assert self.suggest(client, url, q='кино', limit=2) == [
+            'kino0', 'kino1'
+        ], 'Проверьте, что `limit` ограничивает число подсказок.'
+        response = client.get(url, {'q': 'кино', 'limit': 'много'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неверный `limit` возвращает 400.'
+        )
+
+    def test_03_served_from_memory(self, client, admin_client, genres):
+        url = '/api/v1/genres/autocomplete/'
+        self.suggest(client, url, q='д')
+        with CaptureQueriesContext(connection) as context:
+            self.suggest(client, url, q='др')
+        assert not context.captured_queries, (
+            'Проверьте, что подсказки отдаются из памяти без запросов к БД.'
+        )
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Детектив', 'slug': 'detective'})
+        assert self.suggest(client, url, q='д') == ['detective', 'drama'], (
+            'Проверьте, что новый жанр сразу попадает в подсказки.'
+        )
+        admin_client.delete('/api/v1/genres/drama/')
+        assert self.suggest(client, url, q='д') == ['detective'], (
+            'Проверьте, что удалённый жанр пропадает из подсказок.'
+        )
+
+    @pytest.mark.parametrize('url', ('/api/v1/categories/', '/api/v1/genres/'))
+    def test_04_reserved_slug(self, admin_client, url):
+        response = admin_client.post(url, data={
+            'name': 'Подсказки', 'slug': 'autocomplete'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что `{url}` не принимает слаг `autocomplete`: '
+            'такой объект нельзя было бы удалить.'
+        )
+        assert 'slug' in response.json()
+        assert not Category.objects.filter(slug='autocomplete').exists()
+        assert not Genre.objects.filter(slug='autocomplete').exists()
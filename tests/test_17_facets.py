@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Facets:
+
+    FACETS_URL = '/api/v1/titles/facets/'
+
+    @pytest.fixture
+    def catalog(self):
+        films = Category.objects.create(name='Фильмы', slug='films')
+        books = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        for name, year, category, genres in (
+            ('Первый', 1994, films, (drama, comedy)),
+            ('Второй', 1999, films, (drama,)),
+            ('Третий', 2004, books, (comedy,)),
+            ('Четвёртый', 2010, None, ()),
+        ):
+            title = Title.objects.create(
+                name=name, year=year, category=category)
+            title.genre.set(genres)
+
+    def get_facets(self, client, **params):
+        response = client.get(self.FACETS_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.FACETS_URL}` '
+            'возвращает 200.'
+        )
+        return response.json()
+
+    def test_01_counts(self, client, catalog):
+        data = self.get_facets(client)
+        assert data['count'] == 4
+        assert data['genre'] == [
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 2},
+            {'slug': 'drama', 'name': 'Драма', 'count': 2},
+        ], 'Проверьте подсчёт произведений по жанрам.'
+        assert data['category'] == [
+            {'slug': 'films', 'name': 'Фильмы', 'count': 2},
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+        ], 'Проверьте подсчёт произведений по категориям.'
+        assert data['decade'] == [
+            {'decade': 1990, 'count': 2},
+            {'decade': 2000, 'count': 1},
+            {'decade': 2010, 'count': 1},
+        ], 'Проверьте подсчёт произведений по десятилетиям.'
+
+    def test_02_counts_follow_filters(self, client, catalog):
+        data = self.get_facets(client, genre='drama')
+        assert data['count'] == 2
+        assert data['category'] == [
+            {'slug': 'films', 'name': 'Фильмы', 'count': 2},
+        ], 'Проверьте, что счётчики учитывают фильтр по жанру.'
+        data = self.get_facets(client, search='трет')
+        assert data['genre'] == [
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+        ], 'Проверьте, что счётчики учитывают полнотекстовый поиск.'
+
+    def test_03_bounded_queries_and_cache(self, client, admin_client,
+                                          catalog):
+        with CaptureQueriesContext(connection) as context:
+            self.get_facets(client, genre='drama,comedy')
+        assert len(context.captured_queries) <= 3, (
+            'Проверьте, что счётчики считаются не более чем тремя '
+            'запросами независимо от числа жанров и категорий.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            self.get_facets(client, genre='drama,comedy')
+        assert not context.captured_queries, (
+            'Проверьте, что повторный запрос счётчиков отдаётся из кэша.'
+        )
+        Title.objects.create(name='Пятый', year=2011)
+        assert self.get_facets(client, genre='drama,comedy')['count'] == 3
+        assert self.get_facets(client)['decade'][-1] == {
+            'decade': 2010, 'count': 2
+        }, 'Проверьте, что новое произведение сбрасывает кэш счётчиков.'
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db.models import Avg
+
+from api.filters import TitleFilter
+from reviews.models import Title
+from tests.utils import create_single_review, explain
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18RatingOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def rated(self, user_client, moderator_client):
+        titles = {
+            name: Title.objects.create(name=name, year=2000)
+            for name in ('Хорошее', 'Среднее', 'Плохое', 'Без оценок')
+        }
+        for name, scores in (
+            ('Хорошее', (9, 8)),
+            ('Среднее', (7, 6)),
+            ('Плохое', (2,)),
+        ):
+            for client, score in zip((user_client, moderator_client), scores):
+                create_single_review(
+                    client, titles[name].id, 'Отзыв', score)
+        return titles
+
+    def names(self, client, **params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK
+        return [item['name'] for item in response.json()['results']]
+
+    def assert_matches_live_average(self):
+        for title in Title.objects.annotate(live=Avg('reviews__score')):
+            assert title.rating_avg == title.live, (
+                'Проверьте, что хранимая средняя оценка совпадает со средним '
+                'по отзывам.'
+            )
+
+    def test_01_ordering(self, client, rated):
+        assert self.names(client, ordering='-rating') == [
+            'Хорошее', 'Среднее', 'Плохое', 'Без оценок'
+        ], 'Проверьте сортировку `ordering=-rating`.'
+        assert self.names(client, ordering='rating')[1:] == [
+            'Плохое', 'Среднее', 'Хорошее'
+        ], 'Проверьте сортировку `ordering=rating`.'
+
+    def test_02_range(self, client, rated):
+        assert self.names(client, min_rating=6.5, ordering='rating') == [
+            'Среднее', 'Хорошее'
+        ], 'Проверьте фильтр `min_rating`.'
+        assert self.names(
+            client, min_rating=2, max_rating=7, ordering='-rating'
+        ) == ['Среднее', 'Плохое'], (
+            'Проверьте совместную работу `min_rating` и `max_rating`.'
+        )
+        response = client.get(self.TITLES_URL, {'min_rating': 'высокий'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_follows_review_changes(self, client, user_client, rated):
+        self.assert_matches_live_average()
+        title = rated['Плохое']
+        url = f'{self.TITLES_URL}{title.id}/reviews/'
+        review_id = user_client.get(url).json()['results'][0]['id']
+        user_client.patch(f'{url}{review_id}/', data={'score': 10})
+        self.assert_matches_live_average()
+        assert self.names(client, ordering='-rating')[0] == 'Плохое', (
+            'Проверьте, что изменение оценки сразу меняет сортировку.'
+        )
+        user_client.delete(f'{url}{review_id}/')
+        self.assert_matches_live_average()
+        Title.objects.update(rating_avg=None)
+        Title.recount_ratings()
+        self.assert_matches_live_average()
+
+    def test_04_uses_index(self):
+        queryset = Title.objects.order_by('-rating_avg', '-id')[:10]
+        assert any(
+            'title_rating_avg_id_idx' in step for step in explain(queryset)
+        ), 'Проверьте, что сортировка по рейтингу идёт по индексу.'
+        queryset = TitleFilter(
+            {'min_rating': '7'}, queryset=Title.objects.order_by()).qs
+        assert any(
+            'title_rating_avg_id_idx' in step for step in explain(queryset)
+        ), 'Проверьте, что фильтр по рейтингу использует индекс.'
@@ -0,0 +1,116 @@
+import pytest
+from django.db import IntegrityError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.views import (
+    CategoryViewSet, CommentViewSet, GenreViewSet, ReviewViewSet,
+    TitleViewSet, UserViewSet
+)
+from reviews.models import Comment, Genre, GenreTitle, Review, Title
+from tests.utils import explain
+
+ORDERED_LISTS = (
+    (CategoryViewSet, {}),
+    (GenreViewSet, {}),
+    (TitleViewSet, {}),
+    (TitleViewSet, {'ordering': '-rating'}),
+    (TitleViewSet, {'ordering': 'year'}),
+    (ReviewViewSet, {}),
+    (CommentViewSet, {}),
+    (UserViewSet, {}),
+)
+FILTERED_LISTS = (
+    (TitleViewSet, {'genre': 'drama'}),
+    (TitleViewSet, {'genre': 'drama,comedy', 'genre_mode': 'and'}),
+    (TitleViewSet, {'category': 'films'}),
+    (TitleViewSet, {'year': '2000'}),
+    (TitleViewSet, {'min_rating': '7', 'ordering': '-rating'}),
+    (TitleViewSet, {'search': 'мир'}),
+    (ReviewViewSet, {}),
+    (CommentViewSet, {}),
+    (UserViewSet, {'search': 'user'}),
+)
+DETAILS = (
+    (CategoryViewSet, 'films'),
+    (GenreViewSet, 'drama'),
+    (TitleViewSet, 1),
+    (ReviewViewSet, 1),
+    (CommentViewSet, 1),
+    (UserViewSet, 'user'),
+)
+
+
+def full_scans(queryset):
+    """Шаги плана, читающие таблицу целиком без индекса."""
+    return [
+        step for step in explain(queryset)
+        if step.startswith('SCAN ')
+        and ' USING ' not in step and 'VIRTUAL TABLE' not in step
+    ]
+
+
+def case_id(case):
+    viewset, params = case
+    return f'{viewset.__name__}-{params}'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19QueryPlans:
+    """Планы запросов, которые строят представления.
+
+    Страница списка без фильтров должна читаться по индексу в нужном
+    порядке (без сортировки во временном B-дереве), а фильтры и поиск
+    по ключу - без полного просмотра таблицы. Поиск `name` по
+    категориям и жанрам (LIKE '%q%') проверять бессмысленно: для него
+    есть autocomplete.
+    """
+
+    @pytest.fixture
+    def parents(self, user):
+        title = Title.objects.create(name='Мир', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5)
+        Comment.objects.create(review=review, author=user, text='Коммент')
+        return {'title_id': title.id, 'review_id': review.id}
+
+    def build_queryset(self, viewset, params, parents, action='list'):
+        view = viewset(action=action, kwargs=parents, format_kwarg=None)
+        view.request = Request(APIRequestFactory().get('/', params))
+        return view.filter_queryset(view.get_queryset())
+
+    @pytest.mark.parametrize('case', ORDERED_LISTS, ids=case_id)
+    def test_01_list_pages_follow_index(self, case, parents):
+        queryset = self.build_queryset(*case, parents)
+        plan = explain(queryset[:10])
+        assert 'USE TEMP B-TREE FOR ORDER BY' not in plan, (
+            f'Проверьте, что страница {case_id(case)} читается по индексу '
+            f'в порядке сортировки. План: {plan}'
+        )
+
+    @pytest.mark.parametrize('case', FILTERED_LISTS, ids=case_id)
+    def test_02_filters_use_index(self, case, parents):
+        queryset = self.build_queryset(*case, parents)
+        assert not full_scans(queryset[:10]), (
+            f'Проверьте, что запрос {case_id(case)} не просматривает '
+            f'таблицу целиком. План: {explain(queryset[:10])}'
+        )
+
+    @pytest.mark.parametrize(
+        'viewset, value', DETAILS, ids=lambda item: str(
+            getattr(item, '__name__', item)))
+    def test_03_detail_lookups_use_index(self, viewset, value, parents):
+        queryset = self.build_queryset(
+            viewset, {}, parents, action='retrieve'
+        ).filter(**{viewset.lookup_field: value})
+        assert not full_scans(queryset), (
+            f'Проверьте, что поиск объекта в {viewset.__name__} идёт по '
+            f'индексу. План: {explain(queryset)}'
+        )
+
+    def test_04_genre_title_unique(self, parents):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        GenreTitle.objects.create(genre=genre, title_id=parents['title_id'])
+        with pytest.raises(IntegrityError):
+            GenreTitle.objects.create(
+                genre=genre, title_id=parents['title_id'])
@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.db import get_pragmas, set_pragmas
+
+
+def connect(path, pragmas):
+    db = sqlite3.connect(path, isolation_level=None, timeout=0,
+                         check_same_thread=False)
+    set_pragmas(db.cursor(), pragmas)
+    return db
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SqlitePragmas:
+
+    def test_01_profile_applied(self):
+        with connection.cursor() as cursor:
+            active = get_pragmas(
+                cursor, ('synchronous', 'busy_timeout', 'temp_store'))
+        assert active == {
+            'synchronous': 1,
+            'busy_timeout': settings.SQLITE_PRAGMAS['busy_timeout'],
+            'temp_store': 2,
+        }, 'Проверьте, что прагмы применяются к каждому новому соединению.'
+
+    def test_02_command(self, capsys):
+        call_command('sqlitepragmas')
+        output = capsys.readouterr().out
+        for name in settings.SQLITE_PRAGMAS:
+            assert f'{name} = ' in output, (
+                f'Проверьте, что `sqlitepragmas` выводит прагму {name}.'
+            )
+        assert 'synchronous = normal' in output
+
+
+class Test20SqliteConcurrency:
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        path = tmp_path / 'concurrency.sqlite3'
+        db = connect(path, settings.SQLITE_PRAGMAS)
+        db.execute('CREATE TABLE review (id INTEGER PRIMARY KEY, text)')
+        db.execute("INSERT INTO review (text) VALUES ('первый')")
+        db.close()
+        return path
+
+    def test_01_reads_during_write(self, database):
+        writer = connect(database, settings.SQLITE_PRAGMAS)
+        reader = connect(database, settings.SQLITE_PRAGMAS)
+        writer.execute('BEGIN EXCLUSIVE')
+        writer.execute("INSERT INTO review (text) VALUES ('второй')")
+        assert reader.execute('SELECT count(*) FROM review').fetchone() == (
+            1,
+        ), 'Проверьте, что в режиме WAL чтение не ждёт открытую запись.'
+        writer.execute('COMMIT')
+        assert reader.execute('SELECT count(*) FROM review').fetchone() == (
+            2,
+        )
+
+    def test_02_rollback_journal_blocks_reads(self, database):
+        profile = {**settings.SQLITE_PRAGMAS, 'journal_mode': 'delete'}
+        writer = connect(database, profile)
+        reader = connect(database, {**profile, 'busy_timeout': 0})
+        writer.execute('BEGIN EXCLUSIVE')
+        with pytest.raises(sqlite3.OperationalError, match='locked'):
+            reader.execute('SELECT count(*) FROM review').fetchone()
+        writer.execute('ROLLBACK')
+
+    def test_03_writers_wait_instead_of_failing(self, database):
+        first = connect(database, settings.SQLITE_PRAGMAS)
+        second = connect(database, settings.SQLITE_PRAGMAS)
+        first.execute('BEGIN IMMEDIATE')
+        first.execute("INSERT INTO review (text) VALUES ('первый')")
+        timer = threading.Timer(0.2, first.execute, ('COMMIT',))
+        timer.start()
+        started = time.monotonic()
+        second.execute("INSERT INTO review (text) VALUES ('второй')")
+        timer.join()
+        assert time.monotonic() - started >= 0.1, (
+            'Проверьте, что второй писатель ждал блокировку по busy_timeout.'
+        )
+        assert second.execute('SELECT count(*) FROM review').fetchone() == (
+            3,
+        )
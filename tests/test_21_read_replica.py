@@ -0,0 +1,92 @@
+import pytest
+from django.core.management import call_command
+from django.db import connections
+
+from reviews.db import copy_database
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ReadReplica:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def replica(self, tmp_path):
+        connections.databases['replica'] = {
+            **connections['default'].settings_dict,
+            'NAME': str(tmp_path / 'replica.sqlite3'),
+        }
+        copy_database(connections['default'], connections['replica'])
+        yield connections['replica']
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+
+    def names(self, client):
+        return {
+            item['name']
+            for item in client.get(self.TITLES_URL).json()['results']
+        }
+
+    def test_01_reads_go_to_replica(self, client, replica):
+        Title.objects.create(name='Новое', year=2000)
+        assert 'Новое' not in self.names(client), (
+            'Проверьте, что GET-запросы читают с реплики.'
+        )
+        call_command('refreshreplica')
+        assert 'Новое' in self.names(client), (
+            'Проверьте, что `refreshreplica` переносит данные в реплику и '
+            'сбрасывает закэшированные с неё ответы.'
+        )
+
+    def test_02_writes_go_to_primary(self, admin_client, replica):
+        response = admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильмы', 'slug': 'films'})
+        assert response.status_code == 201
+        assert connections['default'].cursor().execute(
+            "SELECT count(*) FROM reviews_category WHERE slug = 'films'"
+        ).fetchone() == (1,), 'Проверьте, что записи идут в основную базу.'
+        assert replica.cursor().execute(
+            "SELECT count(*) FROM reviews_category WHERE slug = 'films'"
+        ).fetchone() == (0,)
+
+    def test_03_read_your_writes(self, client, admin_client, replica):
+        admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильмы', 'slug': 'films'})
+        slugs = {
+            item['slug']
+            for item in admin_client.get('/api/v1/categories/').json()[
+                'results']
+        }
+        assert 'films' in slugs, (
+            'Проверьте, что после записи пользователь читает из основной '
+            'базы и видит свои изменения.'
+        )
+        assert client.get('/api/v1/categories/').json()['results'] == [], (
+            'Проверьте, что остальные пользователи читают с реплики.'
+        )
+
+    def test_04_window_expires(self, settings, admin_client, replica):
+        settings.READ_AFTER_WRITE_SECONDS = -1
+        admin_client.post('/api/v1/categories/', data={
+            'name': 'Фильмы', 'slug': 'films'})
+        assert admin_client.get('/api/v1/categories/').json()[
+            'results'] == [], (
+            'Проверьте, что после окна READ_AFTER_WRITE_SECONDS чтения '
+            'снова идут на реплику.'
+        )
+
+    def test_05_export_reads_replica(self, client, replica):
+        Title.objects.create(name='Новое', year=2000)
+        response = client.get(f'{self.TITLES_URL}export/')
+        assert response.status_code == 200
+        body = b''.join(response.streaming_content)
+        assert 'Новое'.encode() not in body, (
+            'Проверьте, что потоковая выгрузка читает с реплики, хотя '
+            'строки отдаются уже после выхода из dispatch.'
+        )
+        call_command('refreshreplica')
+        body = b''.join(client.get(
+            f'{self.TITLES_URL}export/').streaming_content)
+        assert 'Новое'.encode() in body
@@ -0,0 +1,77 @@
+import logging
+
+import pytest
+from django.conf import settings
+
+ENDPOINTS = (
+    ('api-root', '/api/v1/'),
+    ('users-list', '/api/v1/users/'),
+    ('users-detail', '/api/v1/users/{username}/'),
+    ('users-update-profile', '/api/v1/users/me/'),
+    ('categories-list', '/api/v1/categories/'),
+    ('categories-autocomplete', '/api/v1/categories/autocomplete/?q=cat'),
+    ('genres-list', '/api/v1/genres/'),
+    ('genres-autocomplete', '/api/v1/genres/autocomplete/?q=gen'),
+    ('titles-list', '/api/v1/titles/'),
+    ('titles-detail', '/api/v1/titles/{title_id}/'),
+    ('titles-facets', '/api/v1/titles/facets/'),
+    ('reviews-list', '/api/v1/titles/{title_id}/reviews/'),
+    ('reviews-detail', '/api/v1/titles/{title_id}/reviews/{review_id}/'),
+    ('comments-list',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'),
+    ('comments-detail',
+     '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/'),
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22QueryBudgets:
+    """Число запросов каждого маршрута не растёт вместе с данными.
+
+    Бюджеты берутся из QUERY_BUDGETS и считаются для авторизованного
+    запроса с холодным кэшем. Потоковый `titles/export/` сюда не входит:
+    его запросы растут с числом кусков по `export_chunk_size`.
+    """
+
+    def measure(self, count_queries, client, name, url, catalog):
+        queries, response = count_queries(client, url.format(**vars(catalog)))
+        assert response.wsgi_request.resolver_match.view_name == name
+        return queries
+
+    @pytest.mark.parametrize('name, url', ENDPOINTS, ids=dict(ENDPOINTS))
+    def test_01_budget_at_10_and_1000_rows(self, name, url, admin_client,
+                                           count_queries, catalog):
+        budget = settings.QUERY_BUDGETS[name]
+        catalog.fill(10)
+        small = self.measure(count_queries, admin_client, name, url, catalog)
+        catalog.fill(1000)
+        large = self.measure(count_queries, admin_client, name, url, catalog)
+        assert small <= budget and large <= budget, (
+            f'Маршрут `{name}` делает {small} запросов на 10 строках и '
+            f'{large} на 1000 при бюджете {budget}.'
+        )
+        assert small == large, (
+            f'Проверьте, что число запросов `{name}` не зависит от объёма '
+            'данных.'
+        )
+
+    @pytest.mark.parametrize('rows', (10, 1000))
+    def test_02_auth_budget(self, rows, client, count_queries, catalog):
+        catalog.fill(rows)
+        data = {'username': 'newcomer', 'email': 'newcomer@yamdb.fake'}
+        queries, _ = count_queries(
+            client, '/api/v1/auth/signup/', 'post', data)
+        assert queries <= settings.QUERY_BUDGETS['signup']
+        response = client.post('/api/v1/auth/token/', data={
+            'username': 'newcomer', 'confirmation_code': 'неверный'})
+        assert int(response['X-Query-Count']) <= settings.QUERY_BUDGETS[
+            'token']
+
+    def test_03_over_budget_is_logged(self, settings, client, caplog,
+                                      count_queries):
+        settings.QUERY_BUDGETS = {'titles-list': 0}
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            count_queries(client, '/api/v1/titles/')
+        assert any(
+            'titles-list' in record.getMessage() for record in caplog.records
+        ), 'Проверьте, что превышение бюджета пишется в лог api.queries.'
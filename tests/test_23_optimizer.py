@@ -0,0 +1,116 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from api.optimizer import build_plan, optimize_queryset
+from api.serializers import (
+    FastTitleSerializer, GenreSerializer, ReadTitleSerializer,
+    ReviewSerializer
+)
+from reviews.models import Category, Genre, Review, Title
+
+
+class ReviewWithTitleSerializer(ReviewSerializer):
+    title = serializers.SlugRelatedField(slug_field='name', read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+
+
+class TitleWithReviewsSerializer(serializers.ModelSerializer):
+    genre = GenreSerializer(many=True, read_only=True)
+    reviews = ReviewSerializer(many=True, read_only=True)
+    category = serializers.SlugRelatedField(slug_field='slug',
+                                            read_only=True)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'name', 'genre', 'reviews', 'category')
+
+
+class TitleWithMethodSerializer(serializers.ModelSerializer):
+    shout = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Title
+        fields = ('id', 'shout')
+
+    def get_shout(self, title):
+        return title.name.upper()
+
+
+def lookups(plan):
+    return sorted(lookup.prefetch_through for lookup in plan.prefetch)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Optimizer:
+
+    @pytest.fixture
+    def catalog(self, user, admin, moderator):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'g{number}')
+            for number in range(3)
+        ]
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category)
+            title.genre.set(genres)
+            for author in (user, admin, moderator):
+                Review.objects.create(
+                    title=title, author=author, text='Отзыв', score=5)
+
+    def test_01_plan_from_fields(self):
+        plan = build_plan(Title, ReadTitleSerializer())
+        assert plan.select == ['category']
+        assert lookups(plan) == ['genre']
+        assert {'rating_sum', 'rating_count', 'category__slug'} <= (
+            plan.columns
+        ), 'Проверьте, что столбцы берутся и из Meta.field_columns.'
+        assert 'rating_avg' not in plan.columns
+
+        plan = build_plan(Review, ReviewWithTitleSerializer())
+        assert sorted(plan.select) == ['author', 'title'], (
+            'Проверьте, что новое поле SlugRelatedField подгружается '
+            'через select_related без правки представления.'
+        )
+        assert {'author__username', 'title__name'} <= plan.columns
+
+    def test_02_nested_many(self, catalog):
+        plan = build_plan(Title, TitleWithReviewsSerializer())
+        assert plan.select == ['category']
+        assert lookups(plan) == ['genre', 'reviews']
+        queryset = optimize_queryset(
+            Title.objects.all(), TitleWithReviewsSerializer())
+        with CaptureQueriesContext(connection) as context:
+            data = TitleWithReviewsSerializer(queryset, many=True).data
+        assert len(data) == 5 and len(data[0]['reviews']) == 3
+        assert len(context.captured_queries) == 3, (
+            'Проверьте, что вложенные сериализаторы many=True подгружаются '
+            'через prefetch_related вместе со своими связями.'
+        )
+
+    def test_03_unknown_source_keeps_columns(self, catalog):
+        plan = build_plan(Title, TitleWithMethodSerializer())
+        assert not plan.exact
+        queryset = optimize_queryset(
+            Title.objects.all(), TitleWithMethodSerializer())
+        assert not queryset.query.deferred_loading[0], (
+            'Проверьте, что для SerializerMethodField столбцы не урезаются.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            TitleWithMethodSerializer(queryset, many=True).data
+        assert len(context.captured_queries) == 1
+
+    def test_04_fast_serializer_uses_source(self, catalog):
+        queryset = optimize_queryset(
+            Title.objects.all(), FastTitleSerializer())
+        with CaptureQueriesContext(connection) as context:
+            data = FastTitleSerializer(queryset, many=True).data
+        assert len(data) == 5 and len(data[0]['genre']) == 3
+        assert len(context.captured_queries) == 2, (
+            'Проверьте, что FastTitleSerializer подгружает связи по '
+            'source_serializer.'
+        )
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def parent_selects(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24NestedResources:
+
+    @pytest.fixture
+    def other_title_id(self, catalog):
+        catalog.fill(2)
+        return catalog.title_id + 1
+
+    def test_comment_chain_is_validated(self, user_client, catalog,
+                                        other_title_id):
+        prefix = (f'/api/v1/titles/{other_title_id}/reviews/'
+                  f'{catalog.review_id}/comments/')
+        for url in (prefix, f'{prefix}{catalog.comment_id}/'):
+            response = user_client.get(url)
+            assert response.status_code == 404, (
+                f'GET-запрос к `{url}` с отзывом другого произведения '
+                'должен возвращать 404.'
+            )
+        response = user_client.post(prefix, data={'text': 'Комментарий'})
+        assert response.status_code == 404, (
+            'Комментарий к отзыву другого произведения не должен '
+            'создаваться.'
+        )
+
+    @pytest.mark.parametrize('method,path,table', (
+        ('get', 'reviews/', 'reviews_title'),
+        ('get', 'reviews/{review_id}/', 'reviews_title'),
+        ('get', 'reviews/{review_id}/comments/', 'reviews_review'),
+        ('post', 'reviews/{review_id}/comments/', 'reviews_review'),
+    ))
+    def test_parent_resolved_once(self, user_client, catalog, method, path,
+                                  table):
+        catalog.fill(3)
+        url = f'/api/v1/titles/{catalog.title_id}/' + path.format(
+            review_id=catalog.review_id)
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(user_client, method)(
+                url, data={'text': 'Комментарий'} if method == 'post' else None
+            )
+        assert response.status_code < 400
+        selects = parent_selects(context, table)
+        assert len(selects) == 1, (
+            f'{method.upper()}-запрос к `{url}` должен искать родителя '
+            f'одним запросом, а выполнил {len(selects)}.'
+        )
+
+    def test_review_create_resolves_title_once(self, user_client,
+                                               other_title_id):
+        url = f'/api/v1/titles/{other_title_id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Отзыв',
+                                                   'score': 5})
+        assert response.status_code == 201
+        assert len(parent_selects(context, 'reviews_title')) == 1, (
+            'Создание отзыва должно загружать произведение один раз.'
+        )
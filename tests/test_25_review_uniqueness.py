@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from reviews.db import copy_database
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ReviewUniqueness:
+
+    POSTERS = 4
+
+    @pytest.fixture
+    def title_url(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def test_duplicate_is_400(self, user_client, title_url):
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(title_url, data=data).status_code == 201
+        response = user_client.post(title_url, data=data)
+        assert response.status_code == 400, (
+            'Повторный отзыв того же автора должен возвращать 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Вы уже оставили отзыв!']
+        }
+        title = Title.objects.get()
+        assert (title.rating_sum, title.rating_count) == (5, 1), (
+            'Отклонённый отзыв не должен менять рейтинг произведения.'
+        )
+
+    def test_create_without_duplicate_lookup(self, user_client, title_url):
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                title_url, data={'text': 'Отзыв', 'score': 5})
+        assert response.status_code == 201
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert not lookups, (
+            'Перед созданием отзыва не нужно искать отзыв автора: '
+            'повтор отсекает ограничение one_author_one_title.'
+        )
+
+    @pytest.fixture
+    def database_file(self, title_url, token_user, tmp_path):
+        """Файловая копия тестовой базы для соединений других потоков.
+
+        Общая база в памяти сразу отвечает «table is locked» второму
+        писателю, а файл в WAL с busy_timeout ставит его в очередь,
+        как в рабочем окружении.
+        """
+        settings_dict = connections.databases['default']
+        memory_name = settings_dict['NAME']
+        path = str(tmp_path / 'reviews.sqlite3')
+        copy_database(connection, SimpleNamespace(settings_dict={
+            'NAME': path
+        }))
+        # Переключение в WAL требует монопольной блокировки: делаем его
+        # заранее, а не в гонке первых соединений потоков.
+        db = sqlite3.connect(path)
+        db.execute('PRAGMA journal_mode = wal')
+        db.close()
+        settings_dict['NAME'] = path
+        yield path
+        settings_dict['NAME'] = memory_name
+
+    def test_parallel_posters(self, token_user, title_url, database_file):
+        barrier = threading.Barrier(self.POSTERS)
+
+        def post(number):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
+            barrier.wait()
+            try:
+                return client.post(
+                    title_url, data={'text': f'Отзыв {number}', 'score': 5}
+                ).status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(self.POSTERS) as executor:
+            statuses = sorted(executor.map(post, range(self.POSTERS)))
+        assert statuses == [201] + [400] * (self.POSTERS - 1), (
+            'Из одновременных отзывов одного автора должен создаться один, '
+            f'остальные - получить 400, а получено {statuses}.'
+        )
+        db = sqlite3.connect(database_file)
+        try:
+            assert db.execute(
+                'SELECT count(*) FROM reviews_review').fetchone() == (1,)
+            assert db.execute(
+                'SELECT rating_count FROM reviews_title').fetchone() == (1,), (
+                'Отклонённые отзывы не должны менять рейтинг произведения.'
+            )
+        finally:
+            db.close()
@@ -0,0 +1,106 @@
+import time
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.authentication import TokenCache
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26CachedAuth:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_warm_reads_skip_user_lookup(self, user_client, monkeypatch):
+        decoded = []
+        decode = JWTAuthentication.get_validated_token
+        monkeypatch.setattr(
+            JWTAuthentication, 'get_validated_token',
+            lambda auth, raw: decoded.append(raw) or decode(auth, raw)
+        )
+        user_client.get(self.TITLES_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.TITLES_URL, {'year': 2000})
+        assert response.status_code == 200
+        assert not user_queries(context), (
+            'Повторный запрос с тем же токеном не должен загружать '
+            'пользователя из базы.'
+        )
+        assert len(decoded) == 1, (
+            'Проверенный токен должен браться из кэша, а не разбираться '
+            'заново.'
+        )
+
+    def test_02_role_change_applies_at_once(self, user_client, admin_client,
+                                            user):
+        assert user_client.get(self.USERS_URL).status_code == 403
+        response = admin_client.patch(f'{self.USERS_URL}{user.username}/',
+                                      data={'role': 'admin'})
+        assert response.status_code == 200
+        assert user_client.get(self.USERS_URL).status_code == 200, (
+            'Смена роли через `/users/{username}/` должна сбрасывать '
+            'закэшированного пользователя.'
+        )
+
+    def test_03_deleted_user_rejected(self, user_client, admin_client, user):
+        assert user_client.get(self.ME_URL).status_code == 200
+        response = admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        assert response.status_code == 204
+        assert user_client.get(self.ME_URL).status_code == 401, (
+            'Токен удалённого пользователя не должен приниматься из кэша.'
+        )
+
+    def test_04_profile_from_snapshot(self, user_client, user):
+        user_client.get(self.TITLES_URL)
+        response = user_client.patch(self.ME_URL, data={'bio': 'new bio'})
+        assert response.status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.ME_URL)
+        assert response.json()['bio'] == 'new bio'
+        assert response.json()['email'] == user.email
+        assert len(user_queries(context)) == 1, (
+            'Профиль должен загружаться одним запросом, без догрузки '
+            'отложенных полей по одному.'
+        )
+
+    def test_05_snapshot_expires(self, user_client, user, settings):
+        settings.AUTH_USER_CACHE_SECONDS = 1
+        assert user_client.get(self.USERS_URL).status_code == 403
+        # Так выглядит правка из другого процесса: сигнал сюда не доходит.
+        type(user).objects.filter(pk=user.pk).update(role='admin')
+        time.sleep(1.1)
+        assert user_client.get(self.USERS_URL).status_code == 200, (
+            'Снимок пользователя должен истекать через '
+            'AUTH_USER_CACHE_SECONDS.'
+        )
+
+
+class Test26TokenCache:
+
+    def test_01_bounded(self):
+        tokens = TokenCache(2)
+        expires = time.time() + 60
+        for key in ('a', 'b'):
+            tokens.set(key, key.upper(), expires)
+        tokens.get('a')
+        tokens.set('c', 'C', expires)
+        assert [tokens.get(key) for key in 'abc'] == ['A', None, 'C'], (
+            'Переполненный кэш токенов должен вытеснять давно не читанные.'
+        )
+
+    def test_02_expired(self):
+        tokens = TokenCache(2)
+        tokens.set('a', 'A', time.time() - 1)
+        assert tokens.get('a') is None
+        assert not tokens.entries
@@ -0,0 +1,130 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+def counters(title):
+    title.refresh_from_db()
+    return title.rating_sum, title.rating_count, title.rating
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27RatingCounters:
+
+    @pytest.fixture
+    def titles(self):
+        return [
+            Title.objects.create(name=f'Произведение {number}', year=2000)
+            for number in range(2)
+        ]
+
+    def reviews_url(self, title):
+        return f'/api/v1/titles/{title.id}/reviews/'
+
+    def test_01_create_edit_delete(self, user_client, titles):
+        title = titles[0]
+        response = user_client.post(self.reviews_url(title),
+                                    data={'text': 'Отзыв', 'score': 4})
+        assert response.status_code == 201
+        assert counters(title) == (4, 1, 4), (
+            'Создание отзыва должно увеличивать счётчики оценок.'
+        )
+        url = f'{self.reviews_url(title)}{response.json()["id"]}/'
+        assert user_client.patch(url, data={'score': 9}).status_code == 200
+        assert counters(title) == (9, 1, 9), (
+            'Изменение оценки должно сдвигать сумму оценок.'
+        )
+        response = user_client.patch(url, data={'text': 'Тот же балл'})
+        assert response.status_code == 200
+        assert counters(title) == (9, 1, 9)
+        assert user_client.delete(url).status_code == 204
+        assert counters(title) == (0, 0, None), (
+            'Удаление отзыва должно уменьшать счётчики оценок.'
+        )
+
+    def test_02_stale_instance_updates(self, user, titles):
+        title = titles[0]
+        review = Review.objects.create(title=title, author=user,
+                                       text='Отзыв', score=5)
+        first = Review.objects.get(pk=review.pk)
+        second = Review.objects.get(pk=review.pk)
+        first.score = 7
+        first.save()
+        second.score = 10
+        second.save()
+        assert counters(title) == (10, 1, 10), (
+            'Сдвиг суммы должен считаться от оценки в базе, а не от '
+            'загруженной раньше.'
+        )
+        first.delete()
+        second.delete()
+        assert counters(title) == (0, 0, None), (
+            'Повторное удаление того же отзыва не должно уводить '
+            'счётчики ниже нуля.'
+        )
+
+    def test_03_move_between_titles(self, user, titles):
+        review = Review.objects.create(title=titles[0], author=user,
+                                       text='Отзыв', score=6)
+        review.title = titles[1]
+        review.score = 8
+        review.save()
+        assert counters(titles[0]) == (0, 0, None), (
+            'Перенос отзыва должен вычитать оценку у прежнего произведения.'
+        )
+        assert counters(titles[1]) == (8, 1, 8)
+
+    def test_04_cascade_delete(self, user_client, admin_client, user,
+                               titles):
+        title = titles[0]
+        user_client.post(self.reviews_url(title),
+                         data={'text': 'Отзыв', 'score': 10})
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert counters(title) == (0, 0, None), (
+            'Удаление пользователя должно снимать оценки его отзывов.'
+        )
+        data = admin_client.get(self.reviews_url(title)).json()
+        assert (data['count'], data['results']) == (0, [])
+
+    @staticmethod
+    def title_updates(context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+
+    @pytest.fixture
+    def authors(self, django_user_model):
+        return [
+            django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@y.fake')
+            for number in range(20)
+        ]
+
+    def test_05_title_delete_skips_recount(self, titles, authors):
+        title = titles[0]
+        for author in authors:
+            Review.objects.create(title=title, author=author,
+                                  text='Отзыв', score=5)
+        with CaptureQueriesContext(connection) as context:
+            title.delete()
+        assert not self.title_updates(context), (
+            'Удаление произведения не должно пересчитывать его рейтинг '
+            'по каждому удаляемому отзыву.'
+        )
+        assert counters(titles[1]) == (0, 0, None)
+
+    def test_06_user_delete_recounts_once(self, user, titles):
+        for title in titles:
+            Review.objects.create(title=title, author=user,
+                                  text='Отзыв', score=4)
+        with CaptureQueriesContext(connection) as context:
+            user.delete()
+        assert len(self.title_updates(context)) == 2, (
+            'Каскадное удаление отзывов должно пересчитывать все '
+            'затронутые произведения одним пересчётом.'
+        )
+        assert [counters(title) for title in titles] == [(0, 0, None)] * 2
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.db.models import Value
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReadTitleSerializer, WriteTitleSerializer
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TitleRating:
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Фильм', slug='films')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        titles = []
+        for number in range(4):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category,
+                rating_sum=number * 3, rating_count=number)
+            title.genre.set([genre])
+            titles.append(title)
+        return titles
+
+    def test_01_loaded_counters(self, titles):
+        title = Title.objects.get(pk=titles[2].pk)
+        with CaptureQueriesContext(connection) as context:
+            assert title.rating == 3
+        assert not context.captured_queries, (
+            'Рейтинг по загруженным счётчикам не должен требовать запроса.'
+        )
+
+    def test_02_annotated_and_assigned(self, titles):
+        title = Title.objects.only('id').annotate(
+            rating=Value(7)).get(pk=titles[1].pk)
+        other = Title.objects.only('id').get(pk=titles[2].pk)
+        other.rating = 5
+        with CaptureQueriesContext(connection) as context:
+            assert (title.rating, other.rating) == (7, 5)
+        assert not context.captured_queries, (
+            'Аннотированный или присвоенный рейтинг должен использоваться '
+            'без запроса.'
+        )
+
+    def test_03_deferred_counters_batched(self, titles):
+        loaded = list(Title.objects.only('id', 'name').order_by('id'))
+        with CaptureQueriesContext(connection) as context:
+            Title.load_ratings(loaded)
+            ratings = [title.rating for title in loaded]
+        assert ratings == [None, 3, 3, 3]
+        assert len(context.captured_queries) == 1, (
+            'Отложенные счётчики набора произведений должны догружаться '
+            'одним запросом.'
+        )
+
+    def test_04_refresh_drops_cached_rating(self, titles):
+        title = Title.objects.get(pk=titles[1].pk)
+        assert title.rating == 3
+        Title.objects.filter(pk=title.pk).update(rating_sum=9)
+        title.refresh_from_db()
+        assert title.rating == 9, (
+            'refresh_from_db() должен сбрасывать вычисленный рейтинг.'
+        )
+
+    def test_05_serializers_without_rating_queries(self, titles):
+        queryset = Title.objects.select_related('category').prefetch_related(
+            'genre').order_by('id')
+        loaded = list(queryset)
+        with CaptureQueriesContext(connection) as context:
+            ReadTitleSerializer(loaded, many=True).data
+            for title in loaded:
+                WriteTitleSerializer(title).data
+        assert not context.captured_queries, (
+            'Сериализаторы произведений не должны делать запросов на '
+            'рейтинг каждого произведения.'
+        )